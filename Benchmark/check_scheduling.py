@@ -0,0 +1,156 @@
+"""Deterministic checks of the request scheduler (Pipeline/scheduling.py).
+
+The benchmark stand-ins answer every request at once, so they never reach the hedge,
+retry, budget or timeout branches of ``RequestScheduler.call``. Here a fake translate
+function follows a script of (delay, answer) per attempt, and each check asserts the
+resulting status, attempt count and budget use. Delays are an order of magnitude
+away from the deadlines, so the outcomes do not depend on machine speed.
+
+Usage:
+    python Benchmark/check_scheduling.py
+"""
+import os
+import sys
+import threading
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from Pipeline.scheduling import RequestScheduler, RetryBudget  # noqa: E402
+
+# Every check's scheduler: hedge after 0.05 s, give up after 0.5 s
+HEDGE_DELAY = 0.05
+DEADLINE = 0.5
+SLOW = 2.0
+
+
+class ScriptedTranslate:
+    """Fake translate function: attempt i sleeps ``script[i][0]`` seconds and returns ``script[i][1]``."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, text, pair, timeout=None):
+        with self.lock:
+            delay, answer = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+        if delay:
+            time.sleep(delay)
+        return answer
+
+
+def make_scheduler(script, budget=None, warm=True):
+    """A scheduler over ``script``; ``warm`` preloads latencies so that hedging is enabled."""
+    translate = ScriptedTranslate(script)
+    scheduler = RequestScheduler("Scripted", translate, min_timeout=DEADLINE, max_timeout=DEADLINE,
+                                 min_hedge_delay=HEDGE_DELAY, budget=budget or RetryBudget())
+    if warm:
+        for _ in range(scheduler.latency.min_samples):
+            scheduler.latency.record(0.01)
+    return scheduler, translate
+
+
+# ------------------ Checks ------------------
+def check_first_answer():
+    scheduler, translate = make_scheduler([(0.0, "first")])
+    translation, outcome = scheduler.call("text", None)
+    assert (translation, outcome.status, outcome.attempts) == ("first", "ok", 1), outcome
+    assert translate.calls == 1
+
+def check_hedge_wins():
+    scheduler, _ = make_scheduler([(SLOW, "slow"), (0.0, "hedge")])
+    translation, outcome = scheduler.call("text", None)
+    assert (translation, outcome.status, outcome.attempts) == ("hedge", "hedged", 2), outcome
+    assert outcome.seconds < DEADLINE, outcome
+
+def check_no_hedge_before_latencies_are_known():
+    scheduler, translate = make_scheduler([(0.2, "first"), (0.0, "hedge")], warm=False)
+    translation, outcome = scheduler.call("text", None)
+    assert (translation, outcome.status, outcome.attempts) == ("first", "ok", 1), outcome
+    assert translate.calls == 1
+
+def check_retry_after_failure():
+    scheduler, _ = make_scheduler([(0.0, None), (0.0, "retry")], warm=False)
+    translation, outcome = scheduler.call("text", None)
+    assert (translation, outcome.status, outcome.attempts) == ("retry", "retried", 2), outcome
+
+def check_failure_after_max_attempts():
+    scheduler, translate = make_scheduler([(0.0, None)], warm=False)
+    translation, outcome = scheduler.call("text", None)
+    assert (translation, outcome.status, outcome.attempts) == (None, "failed", scheduler.max_attempts), outcome
+    assert translate.calls == scheduler.max_attempts
+
+def check_timeout():
+    scheduler, _ = make_scheduler([(SLOW, "late")])
+    translation, outcome = scheduler.call("text", None)
+    # The first request and its hedge are both still running at the deadline
+    assert (translation, outcome.status, outcome.attempts) == (None, "timeout", 2), outcome
+    assert DEADLINE <= outcome.seconds < SLOW, outcome
+
+def check_timeouts_stay_out_of_latency_window():
+    scheduler, _ = make_scheduler([(SLOW, "late")])
+    samples = list(scheduler.latency.samples)
+    scheduler.call("text", None)
+    assert list(scheduler.latency.samples) == samples
+    assert scheduler.consecutive_timeouts == 1
+
+def check_timeout_widening_is_bounded():
+    scheduler = RequestScheduler("Scripted", ScriptedTranslate([(0.0, "t")]), initial_timeout=1.0, min_timeout=0.1,
+                                 max_timeout=100.0, timeout_backoff=2.0, max_backoff=4.0)
+    for timeouts, expected in [(0, 1.0), (1, 2.0), (2, 4.0), (10, 4.0)]:
+        scheduler.consecutive_timeouts = timeouts
+        assert scheduler.timeout() == expected, (timeouts, scheduler.timeout())
+    scheduler.call("text", None)
+    assert scheduler.consecutive_timeouts == 0
+
+def check_budget_limits_extra_requests():
+    budget = RetryBudget(ratio=0.0, reserve=2)
+    scheduler, translate = make_scheduler([(0.0, None)], budget=budget, warm=False)
+    _, first = scheduler.call("text", None)
+    _, second = scheduler.call("text", None)
+    # The first call spends the whole reserve on its two retries; the second gets none
+    assert (first.status, first.attempts) == ("failed", 3), first
+    assert (second.status, second.attempts) == ("failed", 1), second
+    assert (budget.calls, budget.extra, translate.calls) == (2, 2, 4)
+
+def check_budget_grows_with_calls():
+    budget = RetryBudget(ratio=0.1, reserve=0)
+    assert not budget.withdraw()
+    for _ in range(20):
+        budget.deposit()
+    assert [budget.withdraw() for _ in range(3)] == [True, True, False]
+
+def check_budget_limits_hedges():
+    budget = RetryBudget(ratio=0.0, reserve=1)
+    scheduler, _ = make_scheduler([(0.2, "first"), (0.0, "hedge"), (0.2, "first")], budget=budget)
+    _, hedged = scheduler.call("text", None)
+    _, unhedged = scheduler.call("text", None)
+    assert (hedged.status, hedged.attempts) == ("hedged", 2), hedged
+    assert (unhedged.status, unhedged.attempts) == ("ok", 1), unhedged
+
+
+CHECKS = [check_first_answer, check_hedge_wins, check_no_hedge_before_latencies_are_known,
+          check_retry_after_failure, check_failure_after_max_attempts, check_timeout,
+          check_timeouts_stay_out_of_latency_window, check_timeout_widening_is_bounded,
+          check_budget_limits_extra_requests, check_budget_grows_with_calls, check_budget_limits_hedges]
+
+
+def main():
+    failures = 0
+    for check in CHECKS:
+        try:
+            check()
+        except AssertionError as e:
+            failures += 1
+            print(f"FAIL {check.__name__}: {e}")
+        else:
+            print(f"ok   {check.__name__}")
+    print(f"\n{len(CHECKS) - failures}/{len(CHECKS)} scheduling checks passed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""Scaling benchmarks for every pipeline stage on synthetic corpora.
+
+Each (stage, size) pair runs the stage's script unchanged in a fresh subprocess with
+the offline stand-ins from ``stand_ins.py`` installed, so wall time and peak resident
+memory are measured per run. Results are compared against a stored baseline and any
+slowdown, memory growth or new failure beyond the tolerance is flagged.
+
+Usage:
+    python Benchmark/run_benchmarks.py --sizes 1000 10000
+    python Benchmark/run_benchmarks.py --save-baseline
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+import synthetic_corpus  # noqa: E402
+
+# ------------------ Stage Definitions ------------------
+# Script to run, the synthetic files it reads from its working directory and its arguments
+STAGES = {
+    "mt_entopt": ("MT_Code/Machine_Translation_ENtoPT.py",
+                  [synthetic_corpus.QUESTIONNAIRE_FILE], []),
+    "mt_pttoen": ("MT_Code/Machine_Translation_PTtoEN.py",
+                  [synthetic_corpus.QUESTIONNAIRE_FILE], []),
+    "comet_entopt": ("COMET_Analysis/COMET_ENtoPT_analysis_with_reference.py",
+                     [synthetic_corpus.TRANSLATIONS_ENtoPT_FILE], []),
+    "comet_pttoen": ("COMET_Analysis/COMET_PTtoEN_analysis_with_reference.py",
+                     [synthetic_corpus.BACK_TRANSLATIONS_PTtoEN_FILE], []),
+    "gee_entopt": ("GEE_Analysis/GEE_ENtoPT.py",
+                   [synthetic_corpus.RESULT_ENtoPT_FILE], []),
+    "gee_pttoen": ("GEE_Analysis/GEE_PTtoEN.py",
+                   [synthetic_corpus.RESULT_PTtoEN_FILE], []),
+    # Both directions, MT and COMET, in one process
+    "pipeline": ("Pipeline/run_pipeline.py",
+                 [synthetic_corpus.QUESTIONNAIRE_FILE], ["--pairs", "ENtoPT", "PTtoEN"]),
+    # Streaming EN -> PT -> EN round trips scored in micro-batches
+    "round_trip": ("Pipeline/run_pipeline.py",
+                   [synthetic_corpus.QUESTIONNAIRE_FILE], ["--round-trip", "--pairs", "ENtoPT"]),
+    # Out-of-core variants: peak memory should stay flat as the corpus grows
+    "comet_entopt_chunked": ("COMET_Analysis/COMET_ENtoPT_analysis_with_reference.py",
+                             [synthetic_corpus.TRANSLATIONS_ENtoPT_FILE], ["--chunk-size", "10000"]),
+    "gee_entopt_chunked": ("GEE_Analysis/GEE_ENtoPT.py",
+                           [synthetic_corpus.RESULT_ENtoPT_FILE], ["--chunk-size", "100000"]),
+    # Plot from an existing aggregate index only (see INDEXED_STAGES)
+    "gee_entopt_plot_only": ("GEE_Analysis/GEE_ENtoPT.py",
+                             [synthetic_corpus.RESULT_ENtoPT_FILE], ["--plot-only"]),
+    "pipeline_chunked": ("Pipeline/run_pipeline.py",
+                         [synthetic_corpus.QUESTIONNAIRE_FILE],
+                         ["--pairs", "ENtoPT", "PTtoEN", "--chunk-size", "10000"]),
+}
+
+# Stages whose working directory already holds the aggregate index of a (results file,
+# direction): it is built in a separate, unmeasured process before the stage runs
+INDEXED_STAGES = {
+    "gee_entopt_plot_only": (synthetic_corpus.RESULT_ENtoPT_FILE, "ENtoPT"),
+}
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_CORPUS_DIR = os.path.join(BENCHMARK_DIR, "corpus")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results", "latest.json")
+
+# Differences below these floors are treated as noise, whatever the relative change
+MIN_SECONDS_DELTA = 0.5
+MIN_MEMORY_DELTA_MB = 16.0
+
+
+# ------------------ Worker (runs inside the measured subprocess) ------------------
+def _peak_rss_mb():
+    """Peak resident set size of the current process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(stage, workdir, result_path, latency):
+    """Runs one stage script with the stand-ins installed and writes its measurements."""
+    import stand_ins
+
+    stand_ins.install(latency=latency)
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    script, _, arguments = STAGES[stage]
+    script = os.path.join(REPO_ROOT, script)
+
+    os.chdir(workdir)
+    sys.argv = [script] + arguments
+    start = time.perf_counter()
+    runpy.run_path(script, run_name="__main__")
+    elapsed = time.perf_counter() - start
+
+    with open(result_path, "w") as handle:
+        json.dump({"seconds": elapsed, "peak_rss_mb": _peak_rss_mb()}, handle)
+
+
+def prepare_worker(stage, workdir):
+    """Builds the aggregate index that an INDEXED_STAGES stage expects in its working directory."""
+    sys.path.insert(0, REPO_ROOT)
+    from Pipeline.aggregates import build_index
+
+    results_file, direction = INDEXED_STAGES[stage]
+    build_index(os.path.join(workdir, results_file), direction)
+
+
+# ------------------ Runner ------------------
+def _limit_memory(limit_bytes):
+    """Returns a preexec_fn that caps the child's address space."""
+    def apply():
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+    return apply
+
+
+def _tail(path, n_lines=5):
+    """Returns the last lines of a log file."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            return "".join(handle.readlines()[-n_lines:]).strip()
+    except OSError:
+        return ""
+
+
+def run_stage(stage, corpus_dir, timeout, memory_limit_gb, latency):
+    """Runs one stage on one corpus in an isolated working directory and returns a record."""
+    with tempfile.TemporaryDirectory(prefix=f"bench_{stage}_") as workdir:
+        # Stages write their outputs next to their inputs, so each run gets its own
+        # directory with links to the shared corpus files.
+        for name in STAGES[stage][1]:
+            source = os.path.join(corpus_dir, name)
+            target = os.path.join(workdir, name)
+            try:
+                os.symlink(source, target)
+            except OSError:
+                shutil.copyfile(source, target)
+        os.makedirs(os.path.join(workdir, "Figures"), exist_ok=True)
+
+        result_path = os.path.join(workdir, "result.json")
+        log_path = os.path.join(workdir, "stage.log")
+        command = [sys.executable, os.path.abspath(__file__), "--worker", stage,
+                   "--workdir", workdir, "--result", result_path, "--latency", str(latency)]
+        preexec = _limit_memory(int(memory_limit_gb * 1024 ** 3)) if memory_limit_gb else None
+
+        with open(log_path, "w") as log:
+            try:
+                if stage in INDEXED_STAGES:
+                    # Separate process, so that neither its time nor its memory is measured
+                    prepare = [sys.executable, os.path.abspath(__file__), "--worker", stage,
+                               "--workdir", workdir, "--prepare"]
+                    prepared = subprocess.run(prepare, stdout=log, stderr=subprocess.STDOUT,
+                                              timeout=timeout, preexec_fn=preexec)
+                    if prepared.returncode != 0:
+                        log.flush()
+                        return {"status": "error", "seconds": None, "peak_rss_mb": None, "detail": _tail(log_path)}
+                completed = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT,
+                                           timeout=timeout, preexec_fn=preexec)
+            except subprocess.TimeoutExpired:
+                return {"status": "timeout", "seconds": None, "peak_rss_mb": None,
+                        "detail": f"exceeded {timeout} s"}
+
+        if completed.returncode != 0 or not os.path.exists(result_path):
+            detail = _tail(log_path)
+            status = "oom" if "MemoryError" in detail or completed.returncode == -9 else "error"
+            return {"status": status, "seconds": None, "peak_rss_mb": None, "detail": detail}
+
+        with open(result_path) as handle:
+            measurements = json.load(handle)
+        return {"status": "ok", **measurements}
+
+
+def scaling_exponent(points):
+    """Log-log slope between the two largest successful sizes (1.0 means linear)."""
+    ok = [(items, seconds) for items, seconds in points if seconds]
+    if len(ok) < 2:
+        return None
+    (n1, t1), (n2, t2) = ok[-2], ok[-1]
+    if n1 == n2 or t1 <= 0:
+        return None
+    return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+# ------------------ Baseline Comparison ------------------
+def find_regressions(results, baseline, tolerance):
+    """Lists every run that is slower, larger or failing compared with the baseline."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None or previous["status"] != "ok":
+            continue
+        if current["status"] != "ok":
+            regressions.append(f"{key}: {current['status']} (baseline ok)")
+            continue
+        for metric, floor, unit in [("seconds", MIN_SECONDS_DELTA, "s"),
+                                    ("peak_rss_mb", MIN_MEMORY_DELTA_MB, "MB")]:
+            before, after = previous[metric], current[metric]
+            if after > before * (1 + tolerance) and after - before > floor:
+                regressions.append(f"{key}: {metric} {before:.2f}{unit} -> {after:.2f}{unit} "
+                                   f"(+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_report(results, stages, sizes):
+    """Prints the time and memory curve of every stage."""
+    for stage in stages:
+        print(f"\n=== {stage} ===")
+        print(f"{'items':>10} {'status':>8} {'seconds':>10} {'peak MB':>10}")
+        points = []
+        for items in sizes:
+            record = results.get(f"{stage}@{items}")
+            if record is None:
+                continue
+            seconds = record["seconds"]
+            peak = record["peak_rss_mb"]
+            print(f"{items:>10} {record['status']:>8} "
+                  f"{'-' if seconds is None else f'{seconds:.2f}':>10} "
+                  f"{'-' if peak is None else f'{peak:.1f}':>10}")
+            points.append((items, seconds))
+        exponent = scaling_exponent(points)
+        if exponent is not None:
+            print(f"Time scaling exponent (largest sizes): {exponent:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Corpus sizes in questionnaire items.")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES),
+                        help="Stages to benchmark.")
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR,
+                        help="Directory where the synthetic corpora are generated and reused.")
+    parser.add_argument("--timeout", type=float, default=3600, help="Per-run timeout in seconds.")
+    parser.add_argument("--memory-limit-gb", type=float, default=16,
+                        help="Per-run address-space limit in GB (0 disables it).")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated round-trip time of each provider call in seconds.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative slowdown or memory growth tolerated before flagging.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write this run's results.")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run's results as the new baseline.")
+    # Internal arguments used when the script re-invokes itself as a measured worker
+    parser.add_argument("--worker", choices=list(STAGES), help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker and args.prepare:
+        prepare_worker(args.worker, args.workdir)
+        return 0
+    if args.worker:
+        run_worker(args.worker, args.workdir, args.result, args.latency)
+        return 0
+
+    sizes = sorted(args.sizes)
+    results = {}
+    for items in sizes:
+        corpus_dir = os.path.join(args.corpus_dir, f"v{synthetic_corpus.CORPUS_VERSION}", str(items))
+        if not os.path.exists(os.path.join(corpus_dir, synthetic_corpus.RESULT_PTtoEN_FILE)):
+            print(f"Generating synthetic corpus with {items} items...")
+            synthetic_corpus.write_corpus(corpus_dir, items)
+
+        for stage in args.stages:
+            key = f"{stage}@{items}"
+            # A stage that already failed at a smaller size will not succeed at a larger one
+            if any(results.get(f"{stage}@{smaller}", {}).get("status") not in (None, "ok")
+                   for smaller in sizes if smaller < items):
+                results[key] = {"status": "skipped", "seconds": None, "peak_rss_mb": None}
+                continue
+            print(f"Running {key}...")
+            results[key] = run_stage(stage, corpus_dir, args.timeout, args.memory_limit_gb, args.latency)
+            if results[key]["status"] != "ok":
+                print(f"  {results[key]['status']}: {results[key].get('detail', '')}")
+
+    print_report(results, args.stages, sizes)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"\nResults saved at: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Baseline saved at: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    regressions = find_regressions(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Offline stand-ins for the translation providers and the COMET model.
+
+``install()`` registers fake ``requests``, ``deepl``, ``openai`` and ``comet`` modules
+in ``sys.modules`` so that the pipeline scripts run unchanged without network access,
+API keys or a GPU. The providers echo their input and the COMET stand-in scores token
+overlap, so a benchmark run measures the pipeline's own overhead rather than remote
+latency or model inference.
+"""
+import sys
+import time
+import types
+from types import SimpleNamespace
+
+# Keep a handle on the real sleep; install() silences the scripts' rate-limit pauses
+_real_sleep = time.sleep
+
+# Simulated round-trip time of every provider call, in seconds
+provider_latency = 0.0
+
+
+def _mock_translate(text):
+    """Echoes the source text after the configured provider latency."""
+    if provider_latency:
+        _real_sleep(provider_latency)
+    return text
+
+
+# ------------------ requests (Azure and Widn.AI) ------------------
+class _Response:
+    """Minimal ``requests.Response`` with the attributes the MT scripts read."""
+
+    def __init__(self, payload):
+        self.status_code = 200
+        self._payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        return None
+
+
+def _post(url, headers=None, json=None, **kwargs):
+    """Answers Azure (list body) and Widn.AI (dict body) translation requests."""
+    if isinstance(json, list):
+        return _Response([{"translations": [{"text": _mock_translate(item["text"])}]} for item in json])
+    return _Response({"targetText": [_mock_translate(text) for text in json["sourceText"]]})
+
+
+class _Session:
+    """Minimal ``requests.Session`` that shares the stand-in ``post``."""
+
+    def __init__(self):
+        self.headers = {}
+
+    def post(self, url, **kwargs):
+        return _post(url, **kwargs)
+
+    def mount(self, prefix, adapter):
+        return None
+
+    def close(self):
+        return None
+
+
+def _requests_module():
+    module = types.ModuleType("requests")
+    module.post = _post
+    module.Session = _Session
+    module.exceptions = SimpleNamespace(RequestException=Exception, Timeout=TimeoutError)
+    return module
+
+
+# ------------------ deepl ------------------
+class _DeepLTranslator:
+    def __init__(self, auth_key, **kwargs):
+        self.auth_key = auth_key
+
+    def translate_text(self, text, source_lang=None, target_lang=None, **kwargs):
+        if isinstance(text, list):
+            return [SimpleNamespace(text=_mock_translate(item)) for item in text]
+        return SimpleNamespace(text=_mock_translate(text))
+
+
+def _deepl_module():
+    module = types.ModuleType("deepl")
+    module.Translator = _DeepLTranslator
+    module.http_client = SimpleNamespace(min_connection_timeout=10.0, max_network_retries=5)
+    return module
+
+
+# ------------------ openai ------------------
+class _ChatCompletions:
+    def create(self, model=None, messages=None, **kwargs):
+        # The scripts append the text after a blank line in the user prompt
+        text = messages[-1]["content"].split("\n\n", 1)[-1]
+        message = SimpleNamespace(content=_mock_translate(text))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class _OpenAI:
+    def __init__(self, api_key=None, **kwargs):
+        self.chat = SimpleNamespace(completions=_ChatCompletions())
+
+
+def _openai_module():
+    module = types.ModuleType("openai")
+    module.OpenAI = _OpenAI
+    return module
+
+
+# ------------------ comet ------------------
+def _overlap_score(mt, ref):
+    """Token-level F1 between a translation and its reference, floored above zero."""
+    mt_tokens = set(str(mt).lower().split())
+    ref_tokens = set(str(ref).lower().split())
+    if not mt_tokens or not ref_tokens:
+        return 0.05
+    common = len(mt_tokens & ref_tokens)
+    return max(0.05, 2 * common / (len(mt_tokens) + len(ref_tokens)))
+
+
+class _TinyCometModel:
+    """Tiny stand-in for an XCOMET checkpoint with the same ``predict`` interface."""
+
+    def predict(self, samples, batch_size=16, gpus=None, progress_bar=True, **kwargs):
+        scores = [_overlap_score(sample["mt"], sample["ref"]) for sample in samples]
+        system_score = sum(scores) / len(scores) if scores else 0.0
+        metadata = SimpleNamespace(error_spans=[[] for _ in scores])
+        return SimpleNamespace(scores=scores, system_score=system_score, metadata=metadata)
+
+
+def _comet_module():
+    module = types.ModuleType("comet")
+    module.download_model = lambda model, saving_directory=None, **kwargs: f"stand-in/{model}"
+    module.load_from_checkpoint = lambda checkpoint_path, **kwargs: _TinyCometModel()
+    return module
+
+
+def install(latency=0.0):
+    """Registers every stand-in module and disables the scripts' rate-limit sleeps."""
+    global provider_latency
+    provider_latency = latency
+    sys.modules["requests"] = _requests_module()
+    sys.modules["deepl"] = _deepl_module()
+    sys.modules["openai"] = _openai_module()
+    sys.modules["comet"] = _comet_module()
+    time.sleep = lambda seconds: None
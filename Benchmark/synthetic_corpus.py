@@ -0,0 +1,183 @@
+import argparse
+import csv
+import os
+import random
+
+# ------------------ Corpus Layout ------------------
+# Scale names match the published instruments so that the hard-coded scale
+# order and colour palette in the GEE scripts keep working on synthetic data.
+SCALES = ["BIS-11", "DII", "SPAI", "PSDQ", "W-ADL", "SCOFF"]
+SYSTEMS = ["Azure", "DeepL", "OpenAI", "WidnAI"]
+SCORED_SYSTEMS = SYSTEMS + ["Human"]
+
+QUESTIONNAIRE_COLUMNS = ["Scale", "Original", "Published_PT",
+                         "Profissional_Translation_ENtoPT", "Profissional_Translation_PTtoEN"]
+COMBINED_COLUMNS = QUESTIONNAIRE_COLUMNS + SYSTEMS
+RESULT_COLUMNS = ["Scale", "Translation", "Sentence_Score"]
+
+QUESTIONNAIRE_FILE = "file.csv"
+TRANSLATIONS_ENtoPT_FILE = "combined_translations_ENtoPT.csv"
+BACK_TRANSLATIONS_PTtoEN_FILE = "combined_back_translations_PTtoEN.csv"
+RESULT_ENtoPT_FILE = "COMET_result_ENtoPT_with_reference.csv"
+RESULT_PTtoEN_FILE = "COMET_result_PTtoEN_with_reference.csv"
+# Bumped whenever the generated text changes, so that corpora written by an older version are not reused
+CORPUS_VERSION = 2
+
+# Parallel EN/PT phrase fragments; several English openings carry contractions
+# so that the contractions.fix passes in the MT and COMET stages have real work.
+SUBJECTS = [
+    ("I", "Eu"),
+    ("I don't", "Eu não"),
+    ("I can't", "Eu não consigo"),
+    ("I'm able to", "Eu sou capaz de"),
+    ("I've tried to", "Eu tentei"),
+    ("I usually", "Eu geralmente"),
+    ("I won't", "Eu não vou"),
+    ("I often", "Eu frequentemente"),
+]
+VERBS = [
+    ("plan", "planejar"),
+    ("finish", "terminar"),
+    ("avoid", "evitar"),
+    ("enjoy", "aproveitar"),
+    ("worry about", "me preocupar com"),
+    ("think about", "pensar sobre"),
+    ("talk about", "falar sobre"),
+    ("remember", "lembrar"),
+]
+OBJECTS = [
+    ("my tasks", "minhas tarefas"),
+    ("my meals", "minhas refeições"),
+    ("social events", "eventos sociais"),
+    ("my body", "meu corpo"),
+    ("daily activities", "atividades diárias"),
+    ("my future", "meu futuro"),
+    ("other people", "outras pessoas"),
+    ("my work", "meu trabalho"),
+]
+ADVERBS = [
+    ("carefully", "cuidadosamente"),
+    ("without thinking", "sem pensar"),
+    ("every day", "todos os dias"),
+    ("at night", "à noite"),
+    ("in public", "em público"),
+    ("quickly", "rapidamente"),
+    ("", ""),
+]
+
+
+def _sentence(parts):
+    """Joins the non-empty fragments of a sentence and closes it with a period."""
+    return " ".join(part for part in parts if part) + "."
+
+
+def _scale_for(index, n_items):
+    """Assigns items to scales in contiguous blocks, as in the real questionnaire."""
+    return SCALES[index * len(SCALES) // n_items]
+
+
+def _item(rng, number):
+    """Builds item ``number``: the EN original, its PT reference and paraphrases."""
+    subject, verb, obj, adverb = (rng.choice(SUBJECTS), rng.choice(VERBS),
+                                  rng.choice(OBJECTS), rng.choice(ADVERBS))
+    # The fragments alone allow only a few thousand sentences; the numbered context makes
+    # every item distinct, so that the translation and COMET caches hit no more often
+    # than they would on a real questionnaire.
+    context = (f"in situation {number}", f"na situação {number}")
+    original = _sentence([subject[0], verb[0], obj[0], adverb[0], context[0]])
+    published_pt = _sentence([subject[1], verb[1], obj[1], adverb[1], context[1]])
+    # The professional translations differ from the references by a dropped subject or
+    # adverb, which is the kind of variation seen between published and new versions.
+    professional_pt = _sentence([subject[1].partition(" ")[2], verb[1], obj[1], adverb[1], context[1]])
+    professional_en = _sentence([subject[0], verb[0], obj[0], context[0]])
+    return original, published_pt, professional_pt, professional_en
+
+
+def _variant(rng, text):
+    """Produces a machine-translation-like variant of a sentence."""
+    words = text.rstrip(".").split()
+    roll = rng.random()
+    if roll < 0.5 or len(words) < 3:
+        return text
+    if roll < 0.8:
+        # Swap two neighbouring words
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    else:
+        # Drop one word
+        del words[rng.randrange(len(words))]
+    return " ".join(words) + "."
+
+
+def _open_writer(path, columns):
+    """Opens a CSV file in the repository's export format (';' separated, UTF-8 with BOM)."""
+    handle = open(path, "w", newline="", encoding="utf-8-sig")
+    writer = csv.writer(handle, delimiter=";")
+    writer.writerow(columns)
+    return handle, writer
+
+
+def write_corpus(out_dir, n_items, seed=0):
+    """Writes every stage input for a synthetic questionnaire of ``n_items`` items.
+
+    Rows are streamed to disk so that generating 10^6 items needs constant memory.
+    Returns a dict mapping each file name to its path.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {name: os.path.join(out_dir, name) for name in
+             [QUESTIONNAIRE_FILE, TRANSLATIONS_ENtoPT_FILE, BACK_TRANSLATIONS_PTtoEN_FILE,
+              RESULT_ENtoPT_FILE, RESULT_PTtoEN_FILE]}
+
+    # ------------------ Wide Files (questionnaire and translations) ------------------
+    rng = random.Random(seed)
+    handles = []
+    try:
+        handle, questionnaire = _open_writer(paths[QUESTIONNAIRE_FILE], QUESTIONNAIRE_COLUMNS)
+        handles.append(handle)
+        handle, forward = _open_writer(paths[TRANSLATIONS_ENtoPT_FILE], COMBINED_COLUMNS)
+        handles.append(handle)
+        handle, backward = _open_writer(paths[BACK_TRANSLATIONS_PTtoEN_FILE], COMBINED_COLUMNS)
+        handles.append(handle)
+
+        for i in range(n_items):
+            row = [_scale_for(i, n_items), *_item(rng, i + 1)]
+            questionnaire.writerow(row)
+            forward.writerow(row + [_variant(rng, row[2]) for _ in SYSTEMS])
+            backward.writerow(row + [_variant(rng, row[1]) for _ in SYSTEMS])
+    finally:
+        for handle in handles:
+            handle.close()
+
+    # ------------------ Long Files (COMET results) ------------------
+    # The GEE scripts rebuild Item_ID with np.tile, so rows must be grouped by system
+    # in the same order in which the COMET scripts melt their wide results.
+    for offset, name in enumerate([RESULT_ENtoPT_FILE, RESULT_PTtoEN_FILE], start=1):
+        handle, writer = _open_writer(paths[name], RESULT_COLUMNS)
+        try:
+            for k, system in enumerate(SCORED_SYSTEMS):
+                system_rng = random.Random(seed * 1000 + offset * 100 + k)
+                for i in range(n_items):
+                    # Beta(8, 1.5) resembles the right-skewed XCOMET distribution; the
+                    # floor keeps every score positive for the Gamma GEE model.
+                    score = max(0.05, min(1.0, system_rng.betavariate(8, 1.5)))
+                    writer.writerow([_scale_for(i, n_items), system, f"{score:.3f}"])
+        finally:
+            handle.close()
+
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic questionnaire corpus for benchmarking.")
+    parser.add_argument("out_dir", help="Directory that receives the generated CSV files.")
+    parser.add_argument("--items", type=int, default=1000, help="Number of questionnaire items.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    args = parser.parse_args(argv)
+
+    paths = write_corpus(args.out_dir, args.items, seed=args.seed)
+    for name, path in paths.items():
+        print(f"{name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
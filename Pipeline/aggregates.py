@@ -0,0 +1,175 @@
+"""Aggregate index of the COMET results.
+
+For every (direction, scale, system) the index keeps the sufficient statistics of the
+sentence scores: their count, sum and sum of squares, and how many fall in each
+quality category of ``get_discrete_quality_score``. Means, standard deviations,
+standard errors and threshold tables follow exactly from these sums, so summaries and
+plots read a few dozen rows instead of rescanning the sentence-level results.
+
+The scoring stage updates the index whenever it writes a results file (block by block
+in chunked mode). The index is a ';'-separated CSV stored next to the results files
+and shared by all directions; re-scoring a direction replaces only that direction's
+rows. Each direction's rows record the size and modification time of the results file
+they were computed from, so a results file changed by any other means is detected and
+its rows are rebuilt, and the COMET model that produced it, so that results of another
+model are not reused.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from Pipeline.scoring import QUALITY_CATEGORIES, quality_category_codes
+
+AGGREGATE_INDEX_FILE = "COMET_aggregate_index.csv"
+KEY_COLUMNS = ["Direction", "Scale", "Translation"]
+SUM_COLUMNS = ["Count", "Sum", "Sum_Sq"] + QUALITY_CATEGORIES
+FINGERPRINT_COLUMNS = ["Results_Size", "Results_Mtime_NS"]
+MODEL_COLUMN = "Model"
+
+
+def index_path(scores_path):
+    """Path of the aggregate index that sits next to a results file."""
+    return os.path.join(os.path.dirname(scores_path), AGGREGATE_INDEX_FILE)
+
+def results_fingerprint(scores_path):
+    """(size, mtime in ns) of a results file, as recorded with its direction's index rows."""
+    stat = os.stat(scores_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class AggregateIndex:
+    """Per-(direction, scale, system) sums of COMET sentence scores."""
+
+    def __init__(self, table=None):
+        self.table = pd.DataFrame(columns=KEY_COLUMNS + SUM_COLUMNS) if table is None else table
+
+    @classmethod
+    def load(cls, path):
+        """Reads an index file, or returns an empty index if it does not exist."""
+        if not os.path.exists(path):
+            return cls()
+        # Nullable integers, so that nanosecond times survive rows without a fingerprint
+        return cls(pd.read_csv(path, sep=";", encoding="utf-8-sig",
+                               dtype={column: "Int64" for column in FINGERPRINT_COLUMNS}))
+
+    def save(self, path):
+        self.table.to_csv(path, index=False, sep=";", encoding="utf-8-sig")
+
+    def directions(self):
+        return set(self.table["Direction"])
+
+    def fingerprint(self, direction):
+        """The results fingerprint stored with ``direction``'s rows, or None if there is none."""
+        if not set(FINGERPRINT_COLUMNS) <= set(self.table.columns):
+            return None
+        rows = self.table.loc[self.table["Direction"] == direction, FINGERPRINT_COLUMNS].drop_duplicates()
+        if len(rows) != 1 or rows.isna().any(axis=None):
+            return None
+        size, mtime_ns = rows.iloc[0]
+        return int(size), int(mtime_ns)
+
+    def model(self, direction):
+        """The COMET model stored with ``direction``'s rows, or None if it is unknown."""
+        if MODEL_COLUMN not in self.table.columns:
+            return None
+        models = self.table.loc[self.table["Direction"] == direction, MODEL_COLUMN].drop_duplicates()
+        if len(models) != 1 or models.isna().any():
+            return None
+        return models.iloc[0]
+
+    def add(self, direction, results):
+        """Adds a block of long-format results (Scale, Translation, Sentence_Score) to the sums."""
+        scores = pd.to_numeric(results["Sentence_Score"], errors="coerce")
+        valid = scores.notna().to_numpy()
+        scores = scores.to_numpy(dtype=float)[valid]
+        block = pd.DataFrame({
+            "Direction": direction,
+            "Scale": results["Scale"].to_numpy()[valid],
+            "Translation": results["Translation"].to_numpy()[valid],
+            "Count": 1,
+            "Sum": scores,
+            "Sum_Sq": scores ** 2,
+        })
+        codes = quality_category_codes(scores)
+        for code, category in enumerate(QUALITY_CATEGORIES):
+            block[category] = (codes == code).astype(int)
+        combined = pd.concat([self.table, block], ignore_index=True) if len(self.table) else block
+        self.table = combined.groupby(KEY_COLUMNS, sort=False, as_index=False)[SUM_COLUMNS].sum()
+
+    def order_systems(self, systems):
+        """Stable-sorts the rows by system, in the given order, as in the long-format results."""
+        position = self.table["Translation"].map({name: i for i, name in enumerate(systems)})
+        self.table = self.table.iloc[np.argsort(position.to_numpy(), kind="stable")].reset_index(drop=True)
+
+    def replace(self, other, direction):
+        """Returns a copy of this index with ``direction``'s rows taken from ``other``."""
+        kept = self.table[self.table["Direction"] != direction]
+        new = other.table[other.table["Direction"] == direction]
+        return AggregateIndex(pd.concat([kept, new], ignore_index=True) if len(kept) else new.reset_index(drop=True))
+
+    def summary(self, direction, by=("Translation",)):
+        """Count, mean, SD, SE and category counts of ``direction``, grouped by the ``by`` columns."""
+        rows = self.table[self.table["Direction"] == direction]
+        sums = rows.groupby(list(by), sort=False, as_index=False)[SUM_COLUMNS].sum()
+        count = sums["Count"].astype(float)
+        sums["Mean"] = sums["Sum"] / count
+        # Sample variance (ddof=1) from the sums, as pandas' std and sem compute it
+        variance = (sums["Sum_Sq"] - sums["Sum"] ** 2 / count) / (count - 1)
+        sums["SD"] = np.sqrt(variance.clip(lower=0))
+        sums["SE"] = sums["SD"] / np.sqrt(count)
+        return sums[list(by) + ["Count", "Mean", "SD", "SE"] + QUALITY_CATEGORIES]
+
+
+def update_index(scores_path, direction, index, model_name=None):
+    """Replaces ``direction``'s rows of the index file next to ``scores_path`` with ``index``.
+
+    The rows are stamped with the fingerprint of ``scores_path``, which must already be
+    written, and with the COMET model that scored it (None when it is not known).
+    """
+    path = index_path(scores_path)
+    stamped = AggregateIndex(index.table.copy())
+    stamped.table[FINGERPRINT_COLUMNS[0]], stamped.table[FINGERPRINT_COLUMNS[1]] = results_fingerprint(scores_path)
+    stamped.table[MODEL_COLUMN] = model_name
+    updated = AggregateIndex.load(path).replace(stamped, direction)
+    updated.table[FINGERPRINT_COLUMNS] = updated.table[FINGERPRINT_COLUMNS].astype("Int64")
+    updated.save(path)
+    return path
+
+def build_index(scores_path, direction, chunk_size=100_000):
+    """Builds ``direction``'s index by reading a results file in blocks, and saves it.
+
+    The results file does not say which model scored it, so the rebuilt rows record none.
+    """
+    index = AggregateIndex()
+    for chunk in pd.read_csv(scores_path, sep=";", encoding="utf-8-sig", chunksize=chunk_size):
+        index.add(direction, chunk)
+    update_index(scores_path, direction, index)
+    return index
+
+def current_index(scores_path, direction, chunk_size=100_000):
+    """Returns the index of ``direction``, rebuilding it unless it matches the current results file.
+
+    If the results file no longer exists, the stored rows are used as they are.
+    """
+    index = AggregateIndex.load(index_path(scores_path))
+    if direction in index.directions() and (not os.path.exists(scores_path)
+                                            or index.fingerprint(direction) == results_fingerprint(scores_path)):
+        return index
+    return build_index(scores_path, direction, chunk_size)
+
+def scored_with(scores_path, direction):
+    """The COMET model recorded for a results file, or None if unknown or the index is out of date."""
+    if not os.path.exists(scores_path):
+        return None
+    index = AggregateIndex.load(index_path(scores_path))
+    if index.fingerprint(direction) != results_fingerprint(scores_path):
+        return None
+    return index.model(direction)
+
+def print_summary(index, direction, path=None):
+    """Prints each system's count, mean, SD and number of sentences per quality category."""
+    summary = index.summary(direction).round({"Mean": 3, "SD": 3, "SE": 3})
+    source = f" (from {path})" if path else ""
+    print(f"\n[{direction}] COMET scores by system{source}:")
+    print(summary.to_string(index=False))
@@ -0,0 +1,243 @@
+"""Out-of-core mode: every stage works on fixed-size blocks of rows.
+
+The questionnaire, the previous translations file and the translations to score are
+read with ``pd.read_csv(chunksize=...)``, so at most one block per pair is in memory:
+
+* MT: each block is translated by all providers at once (as in engine.translate_pairs)
+  and appended to ``<translations>.part``, which replaces the translations file at
+  the end. Cached translations are read block by block in step with the questionnaire,
+  and the outcome of every request is appended to the request log.
+* COMET: each block is scored as soon as it is translated; its scores are appended to
+  one part file per system and added to the aggregate index (see aggregates.py). At the
+  end the part files are concatenated in system order, giving the same long-format file
+  (systems stacked one after the other) as the in-memory mode.
+
+The process-wide translation and segment caches are capped at one block per pair for
+the duration of the run (see block_sized_caches).
+"""
+import os
+import shutil
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from Pipeline import providers as provider_module, scoring
+from Pipeline.aggregates import AggregateIndex, print_summary, update_index
+from Pipeline.engine import (build_translation_job, check_columns, iter_sources, matching_cache,
+                             preprocess_for_scoring, report_pending, report_requests, reuse_scores,
+                             scored_columns, scores_are_current, translate_pairs)
+from Pipeline.scoring import comet_model_name, score_systems
+
+RESULT_COLUMNS = ["Scale", "Translation", "Sentence_Score"]
+
+
+class CsvAppender:
+    """Writes a ';'-separated CSV block by block: the first block with its header, the rest appended."""
+
+    def __init__(self, path, header=True):
+        self.path = path
+        self.header = header
+        self.started = False
+
+    def write(self, df):
+        if self.started:
+            df.to_csv(self.path, mode="a", header=False, index=False, sep=";", encoding="utf-8")
+        else:
+            # The BOM only belongs at the start of a file, as in the in-memory exports
+            df.to_csv(self.path, header=self.header, index=False, sep=";",
+                      encoding="utf-8-sig" if self.header else "utf-8")
+            self.started = True
+
+
+class ChunkedScorer:
+    """Scores a pair's translations block by block, keeping only the aggregate index in memory."""
+
+    def __init__(self, pair, output_path, model_name=comet_model_name, batch_size=15):
+        self.pair = pair
+        self.output_path = output_path
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.systems = scored_columns(pair)
+        self.parts = {name: CsvAppender(f"{output_path}.{name}.part", header=False) for name in self.systems}
+        self.index = AggregateIndex()
+
+    def add(self, chunk):
+        """Scores one block of translations and appends its long-format rows to the part files."""
+        check_columns(chunk, ["Scale", self.pair.source_column, self.pair.reference_column] + self.systems,
+                      f"[{self.pair.name}] translations")
+        chunk = preprocess_for_scoring(self.pair, chunk)
+        results = score_systems(self.model_name, chunk[self.pair.source_column].tolist(),
+                                chunk[self.pair.reference_column].tolist(),
+                                {name: chunk[name].tolist() for name in self.systems},
+                                batch_size=self.batch_size)
+
+        for name in self.systems:
+            block = pd.DataFrame({
+                "Scale": chunk["Scale"].to_numpy(),
+                "Translation": "Human" if name == self.pair.human_column else name,
+                "Sentence_Score": np.asarray(results[name]["sentence_scores"], dtype=float),
+            }).round(3)
+            self.parts[name].write(block)
+            self.index.add(self.pair.name, block)
+
+    def finish(self):
+        """Concatenates the per-system part files into the results file and saves the aggregate index."""
+        pd.DataFrame(columns=RESULT_COLUMNS).to_csv(self.output_path, index=False, sep=";", encoding="utf-8-sig")
+        with open(self.output_path, "ab") as output:
+            for name in self.systems:
+                part = self.parts[name].path
+                if os.path.exists(part):
+                    with open(part, "rb") as handle:
+                        shutil.copyfileobj(handle, output)
+                    os.remove(part)
+
+        print(f"\n[{self.pair.name}] Evaluation with reference completed. Results saved at: {self.output_path}")
+        # Blocks interleave the systems; list them one after the other, as in the results file
+        self.index.order_systems(["Human" if name == self.pair.human_column else name for name in self.systems])
+        print_summary(self.index, self.pair.name,
+                      update_index(self.output_path, self.pair.name, self.index, self.model_name))
+
+
+@contextmanager
+def block_sized_caches(limit):
+    """Caps the translation and segment caches at ``limit`` entries each while the block runs.
+
+    The caches are shared by the whole process and otherwise hold up to a million
+    entries, which would make memory grow with the corpus instead of the block size.
+    """
+    saved = provider_module.translation_cache_limit, scoring.segment_cache_limit
+    provider_module.translation_cache_limit = scoring.segment_cache_limit = limit
+    try:
+        yield
+    finally:
+        provider_module.translation_cache_limit, scoring.segment_cache_limit = saved
+
+
+def _iter_csv(path, chunk_size):
+    """Returns an iterator over the blocks of a ';'-separated export; raises if the file is missing."""
+    return pd.read_csv(path, delimiter=";", encoding="utf-8-sig", chunksize=chunk_size)
+
+
+def score_file_chunked(pair, translations_path, scores_path, model_name, batch_size, chunk_size):
+    """Scores a translations file block by block."""
+    scorer = ChunkedScorer(pair, scores_path, model_name=model_name, batch_size=batch_size)
+    for chunk in _iter_csv(translations_path, chunk_size):
+        scorer.add(chunk)
+    scorer.finish()
+
+
+def run_pipeline_chunked(pairs, stages, paths, providers, model_name=comet_model_name, batch_size=15,
+                         dry_run=False, force=False, chunk_size=10_000):
+    """Chunked counterpart of engine.run_pipeline."""
+    # Room for every scored system of one block per pair, i.e. the blocks in flight
+    with block_sized_caches(chunk_size * sum(len(scored_columns(pair)) for pair in pairs)):
+        _run_pipeline_chunked(pairs, stages, paths, providers, model_name, batch_size, dry_run, force, chunk_size)
+
+
+def _run_pipeline_chunked(pairs, stages, paths, providers, model_name, batch_size, dry_run, force, chunk_size):
+    if "mt" not in stages:
+        for pair in pairs:
+            translations_path, scores_path = paths[pair.name]["translations"], paths[pair.name]["scores"]
+            up_to_date = not force and scores_are_current(pair, translations_path, scores_path, model_name)
+            if dry_run:
+                n_rows = sum(len(chunk) for chunk in _iter_csv(translations_path, chunk_size))
+                print(f"Dry run: {translations_path} has {n_rows} rows; "
+                      f"{scores_path} is {'up to date' if up_to_date else 'to be scored'}.")
+            elif up_to_date:
+                reuse_scores(pair, translations_path, scores_path, model_name, chunk_size)
+            else:
+                score_file_chunked(pair, translations_path, scores_path, model_name, batch_size, chunk_size)
+        return
+
+    # ------------------ MT (and COMET) by blocks ------------------
+    states = {}
+    for pair in pairs:
+        translations_path = paths[pair.name]["translations"]
+        scores_path = paths[pair.name]["scores"]
+        # Current scores (newer than the translations, same model) are only redone if a block changes
+        score_live = "comet" in stages and (force or not scores_are_current(pair, translations_path, scores_path,
+                                                                            model_name))
+        states[pair.name] = {
+            "sources": iter_sources(pair, paths[pair.name]["questionnaire"], chunk_size),
+            # A missing translations file only means that nothing is cached yet
+            "cached": iter(()) if force or not os.path.exists(translations_path)
+            else _iter_csv(translations_path, chunk_size),
+            "output": CsvAppender(f"{translations_path}.part"),
+            "requests": CsvAppender(paths[pair.name]["requests"]),
+            "request_counts": pd.Series(dtype=int),
+            "scorer": ChunkedScorer(pair, scores_path, model_name, batch_size) if score_live and not dry_run else None,
+            "changed": not os.path.exists(translations_path),
+            "rows": 0,
+            "pending": {provider: 0 for provider in providers},
+        }
+
+    def on_job_done(job):
+        state = states[job.pair.name]
+        state["output"].write(job.df)
+        state["changed"] = state["changed"] or job.changed
+        if job.changed:
+            request_log = job.request_log()
+            state["requests"].write(request_log)
+            state["request_counts"] = state["request_counts"].add(request_log["Status"].value_counts(),
+                                                                  fill_value=0).astype(int)
+        if state["scorer"] is not None:
+            state["scorer"].add(job.df)
+
+    while True:
+        jobs = []
+        for pair in pairs:
+            state = states[pair.name]
+            chunk = next(state["sources"], None)
+            if chunk is None:
+                # Cached rows past the end of the questionnaire belong to removed items,
+                # so the translations file must be rewritten without them
+                if next(state["cached"], None) is not None:
+                    state["changed"] = True
+                state["cached"] = iter(())
+                continue
+            cache = {}
+            cached_chunk = next(state["cached"], None)
+            if cached_chunk is not None:
+                cache = matching_cache(pair, chunk, cached_chunk, paths[pair.name]["translations"])
+                if not cache:
+                    state["cached"] = iter(())  # Rows no longer line up; stop reading the old file
+            job = build_translation_job(pair, chunk, state["output"].path, providers, cache)
+            state["rows"] += len(chunk)
+            for provider, rows in job.pending.items():
+                state["pending"][provider] += len(rows)
+            jobs.append(job)
+        if not jobs:
+            break
+        if not dry_run:
+            translate_pairs(jobs, providers, on_job_done)
+
+    for pair in pairs:
+        state = states[pair.name]
+        translations_path, scores_path = paths[pair.name]["translations"], paths[pair.name]["scores"]
+        if dry_run:
+            report_pending(pair, state["rows"], state["pending"])
+            continue
+
+        part = state["output"].path
+        if state["changed"]:
+            os.replace(part, translations_path)
+            print(f"\n[{pair.name}] All translations completed and saved at: {translations_path}")
+            if state["requests"].started:
+                report_requests(pair, state["request_counts"], state["requests"].path)
+        else:
+            if os.path.exists(part):
+                os.remove(part)
+            print(f"\n[{pair.name}] All translations cached in: {translations_path}")
+
+        if "comet" not in stages:
+            continue
+        if state["scorer"] is not None:
+            state["scorer"].finish()
+        elif state["changed"]:
+            score_file_chunked(pair, translations_path, scores_path, model_name, batch_size, chunk_size)
+        else:
+            reuse_scores(pair, translations_path, scores_path, model_name, chunk_size)
+
+    if dry_run:
+        print("\nDry run: inputs are valid; nothing was translated or scored.")
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+
+# ------------------ Language Pairs ------------------
+# Everything that differs between translation directions lives here; the MT and
+# COMET stages in engine.py are written once against these fields. Adding a target
+# locale means adding a LanguagePair whose columns exist in the questionnaire.
+
+
+@dataclass(frozen=True)
+class LanguagePair:
+    """Language codes, questionnaire columns and file names of one translation direction."""
+    name: str
+    source_column: str          # text sent to the MT providers and used as COMET "src"
+    reference_column: str       # published version used as COMET "ref"
+    human_column: str           # professional translation, scored as the "Human" system
+    source_locale: str
+    target_locale: str
+    azure_codes: tuple          # (from, to) query parameters
+    deepl_codes: tuple          # (source_lang, target_lang)
+    widn_codes: tuple           # (sourceLocale, targetLocale)
+    openai_languages: tuple     # (source, target) language names used in the prompt
+    expand_source_contractions: bool  # expand contractions before translating
+    contraction_columns: tuple  # columns whose contractions are expanded before COMET scoring
+    questionnaire_file: str
+    translations_file: str
+    scores_file: str
+    round_trip_file: str        # streaming round-trip results (see streaming.py)
+    requests_file: str          # outcome of every MT request (see scheduling.py)
+    figure_file: str            # GEE bar plot, saved under Figures/ (see gee.py)
+    gee_scale_order: tuple      # GEE scales, reference first; () puts the best-scoring scale first
+
+
+LANGUAGE_PAIRS = {
+    "ENtoPT": LanguagePair(
+        name="ENtoPT",
+        source_column="Original",
+        reference_column="Published_PT",
+        human_column="Profissional_Translation_ENtoPT",
+        source_locale="en",
+        target_locale="pt-BR",
+        azure_codes=("en", "pt-BR"),
+        deepl_codes=("EN", "PT-BR"),
+        widn_codes=("en", "pt-BR"),
+        openai_languages=("English", "Brazilian Portuguese"),
+        expand_source_contractions=True,
+        contraction_columns=("Original",),
+        questionnaire_file="file.csv",
+        translations_file="combined_translations_ENtoPT.csv",
+        scores_file="COMET_result_ENtoPT_with_reference.csv",
+        round_trip_file="COMET_round_trip_ENtoPT.csv",
+        requests_file="MT_requests_ENtoPT.csv",
+        figure_file="COMET_Translation_Scales_ENtoPT.png",
+        gee_scale_order=(),
+    ),
+    "PTtoEN": LanguagePair(
+        name="PTtoEN",
+        source_column="Published_PT",
+        reference_column="Original",
+        human_column="Profissional_Translation_PTtoEN",
+        source_locale="pt-BR",
+        target_locale="en",
+        azure_codes=("pt-BR", "en-US"),
+        deepl_codes=("PT", "EN-US"),
+        widn_codes=("pt-BR", "en"),
+        openai_languages=("Brazilian Portuguese", "American English"),
+        expand_source_contractions=False,
+        # The English reference and every English back-translation
+        contraction_columns=("Original", "Azure", "DeepL", "OpenAI", "WidnAI",
+                             "Profissional_Translation_PTtoEN"),
+        questionnaire_file="file.csv",
+        translations_file="combined_back_translations_PTtoEN.csv",
+        scores_file="COMET_result_PTtoEN_with_reference.csv",
+        round_trip_file="COMET_round_trip_PTtoEN.csv",
+        requests_file="MT_requests_PTtoEN.csv",
+        figure_file="COMET_Translation_Scales_PTtoEN.png",
+        # DII is the reference scale of the back-translation models
+        gee_scale_order=("DII", "SPAI", "PSDQ", "BIS-11", "W-ADL", "SCOFF"),
+    ),
+}
+
+
+def reverse_pair(pair):
+    """Returns the pair that translates back from ``pair``'s target locale to its source locale."""
+    for candidate in LANGUAGE_PAIRS.values():
+        if (candidate.source_locale, candidate.target_locale) == (pair.target_locale, pair.source_locale):
+            return candidate
+    raise ValueError(f"No language pair translates {pair.target_locale} back to {pair.source_locale}.")
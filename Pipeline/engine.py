@@ -0,0 +1,465 @@
+"""Direction-parametric MT and COMET engine.
+
+One process can translate and score any number of language pairs (see directions.py).
+Every provider runs in its own thread and works through the pairs in order, so all
+providers stay busy at once; as soon as every provider has finished a pair, that pair
+is saved and scored with COMET in the main thread while the providers move on to the
+next pair. Provider clients, HTTP sessions, the translation cache, the COMET model and
+its segment cache are shared by all pairs.
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+from tqdm import tqdm
+
+from Pipeline.aggregates import AggregateIndex, current_index, index_path, print_summary, scored_with, update_index
+from Pipeline.directions import LANGUAGE_PAIRS
+from Pipeline.providers import PROVIDERS, translate_with_outcome
+from Pipeline.scheduling import OUTCOME_COLUMNS
+from Pipeline.scoring import comet_model_name, score_systems
+
+STAGES = ["mt", "comet"]
+
+
+def check_columns(df, required, path):
+    """Raises a ValueError naming the required columns that ``df`` lacks."""
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing required column(s): {', '.join(missing)}")
+
+def print_processing_time(start_time):
+    """Prints the time elapsed since ``start_time`` in a human-readable format."""
+    elapsed_time = time.time() - start_time
+    hours = int(elapsed_time // 3600)
+    minutes = int((elapsed_time % 3600) // 60)
+    seconds = elapsed_time % 60
+    print(f"\nTotal processing time: {hours} hours, {minutes} minutes, {seconds:.2f} seconds")
+
+
+# ------------------ MT Stage ------------------
+def _prepare_sources(pair, df, path):
+    """Checks a block of questionnaire rows and, for English sources, expands contractions."""
+    check_columns(df, ["Scale", pair.source_column], path)
+
+    if pair.expand_source_contractions:
+        import contractions
+
+        df[pair.source_column] = df[pair.source_column].apply(
+            lambda x: contractions.fix(str(x)) if pd.notnull(x) else None)
+    return df
+
+def load_sources(pair, path):
+    """Reads the questionnaire and, for English sources, expands contractions."""
+    return _prepare_sources(pair, pd.read_csv(path, delimiter=";", encoding="utf-8-sig"), path)
+
+def iter_sources(pair, path, chunk_size):
+    """Yields the questionnaire in blocks of ``chunk_size`` rows, prepared like ``load_sources``."""
+    for chunk in pd.read_csv(path, delimiter=";", encoding="utf-8-sig", chunksize=chunk_size):
+        yield _prepare_sources(pair, chunk, path)
+
+def matching_cache(pair, df, cached, output_path):
+    """Returns the provider columns of ``cached`` if its source rows match ``df``, else {}."""
+    if len(cached) != len(df) or pair.source_column not in cached.columns \
+            or not cached[pair.source_column].reset_index(drop=True).equals(
+                df[pair.source_column].reset_index(drop=True)):
+        print(f"Ignoring {output_path}: its source rows do not match the input.")
+        return {}
+    cached = cached.set_axis(df.index)
+    return {col: cached[col].astype(object) for col in PROVIDERS if col in cached.columns}
+
+def load_cached_translations(pair, df, output_path):
+    """Returns the provider columns of a previous output whose source rows match ``df``."""
+    if not os.path.exists(output_path):
+        return {}
+    return matching_cache(pair, df, pd.read_csv(output_path, delimiter=";", encoding="utf-8-sig"), output_path)
+
+def pending_rows(sources, cached):
+    """Index of the rows that have a source text but no cached translation."""
+    if cached is None:
+        return sources.index[sources.notna()]
+    return sources.index[sources.notna() & cached.isna()]
+
+
+@dataclass
+class TranslationJob:
+    """One language pair's questionnaire and the rows each provider still has to translate."""
+    pair: object
+    df: pd.DataFrame
+    output_path: str
+    pending: dict                                 # provider -> index of pending rows
+    texts: dict                                   # provider -> source texts of those rows
+    results: dict = field(default_factory=dict)   # provider -> translations, in row order
+    outcomes: dict = field(default_factory=dict)  # provider -> RequestOutcome of each translation
+
+    @property
+    def changed(self):
+        return any(len(rows) for rows in self.pending.values())
+
+    def request_log(self):
+        """One row per translation request: its item, provider, status, attempts and timing."""
+        rows = [(index + 1, outcome.provider, outcome.status, outcome.attempts, outcome.seconds, outcome.timeout)
+                for provider, outcomes in self.outcomes.items()
+                for index, outcome in zip(self.pending[provider], outcomes)]
+        return pd.DataFrame(rows, columns=OUTCOME_COLUMNS)
+
+def prepare_translation_job(pair, input_path, output_path, providers, force=False):
+    """Loads a pair's questionnaire, reuses cached translations and lists the pending rows."""
+    df = load_sources(pair, input_path)
+    cache = {} if force else load_cached_translations(pair, df, output_path)
+    return build_translation_job(pair, df, output_path, providers, cache)
+
+def build_translation_job(pair, df, output_path, providers, cache):
+    """Fills the provider columns of ``df`` from ``cache`` and lists the rows still to translate."""
+    pending, texts = {}, {}
+    for col in PROVIDERS:
+        cached = cache.get(col)
+        df[col] = cached if cached is not None else None
+        if col in providers:
+            pending[col] = pending_rows(df[pair.source_column], cached)
+            texts[col] = [str(text) for text in df.loc[pending[col], pair.source_column]]
+    return TranslationJob(pair, df, output_path, pending, texts)
+
+def report_pending(pair, n_rows, pending_counts):
+    """Prints how many rows each provider would translate, without creating any client."""
+    print(f"\n[{pair.name}] {n_rows} rows")
+    for provider, count in pending_counts.items():
+        api_key = PROVIDERS[provider][1]
+        key_status = "set" if os.getenv(api_key) else "MISSING"
+        if count:
+            print(f"  {provider}: {count} rows to translate ({api_key} {key_status}).")
+        else:
+            print(f"  {provider}: all translations cached.")
+
+def report_requests(pair, counts, path):
+    """Prints how many requests ended in each status, e.g. how many were hedged or timed out."""
+    print(f"\n[{pair.name}] Requests: " + ", ".join(f"{status} {count}" for status, count in counts.items())
+          + f" (details in {path})")
+
+def report_translation_job(job):
+    """Prints what a job would translate, without creating any client."""
+    report_pending(job.pair, len(job.df), {provider: len(rows) for provider, rows in job.pending.items()})
+
+def _provider_worker(provider, jobs, finished, position, stop):
+    """Translates one provider's pending rows of every job, pair after pair, until ``stop`` is set."""
+    try:
+        total = sum(len(job.texts[provider]) for job in jobs)
+        with tqdm(total=total, desc=f"{provider} Translating", position=position) as bar:
+            for job in jobs:
+                translations, outcomes = [], []
+                for text in job.texts[provider]:
+                    if stop.is_set():
+                        return
+                    translation, outcome = translate_with_outcome(provider, text, job.pair)
+                    translations.append(translation)
+                    outcomes.append(outcome)
+                    bar.update()
+                job.results[provider] = translations
+                job.outcomes[provider] = outcomes
+                finished.put((job, None))
+                if translations:
+                    time.sleep(1)  # Pause of 1 second between API calls to avoid rate limits
+    except BaseException as e:
+        finished.put((None, e))
+
+def translate_pairs(jobs, providers, on_job_done):
+    """Runs the providers concurrently over all jobs and calls ``on_job_done`` for each finished job.
+
+    ``on_job_done`` runs in the calling thread, so a pair can be saved and scored while
+    the providers are still translating the pairs after it.
+    """
+    if not providers:
+        for job in jobs:
+            on_job_done(job)
+        return
+
+    finished = queue.Queue()
+    remaining = {id(job): len(providers) for job in jobs}
+    stop = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=len(providers))
+    try:
+        for position, provider in enumerate(providers):
+            pool.submit(_provider_worker, provider, jobs, finished, position, stop)
+
+        done = 0
+        while done < len(jobs):
+            job, error = finished.get()
+            if error is not None:
+                raise error
+            remaining[id(job)] -= 1
+            if remaining[id(job)]:
+                continue
+            # Provider threads only fill job.results; the DataFrame is written here
+            for provider in providers:
+                if len(job.pending[provider]):
+                    job.df.loc[job.pending[provider], provider] = job.results[provider]
+            on_job_done(job)
+            done += 1
+    except BaseException:
+        # Stop the other providers after their current request instead of letting them
+        # translate the remaining pairs, whose results could no longer be saved
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
+# ------------------ COMET Stage ------------------
+def scored_columns(pair):
+    """Columns scored by COMET: every MT provider plus the professional translation."""
+    return list(PROVIDERS) + [pair.human_column]
+
+def load_translations(pair, path):
+    """Reads a combined translations file and checks that every scored column is present."""
+    df = pd.read_csv(path, delimiter=";", encoding="utf-8-sig")
+    check_columns(df, ["Scale", pair.source_column, pair.reference_column] + scored_columns(pair), path)
+    return df
+
+def preprocess_for_scoring(pair, df):
+    """Returns a copy of ``df`` with contractions expanded in the pair's English columns."""
+    import contractions
+
+    df = df.copy()
+    for col in pair.contraction_columns:
+        df[col] = df[col].apply(lambda x: contractions.fix(str(x)))
+    return df
+
+def is_up_to_date(input_path, output_path):
+    """True when the results file exists and is newer than the translations it scores."""
+    return os.path.exists(output_path) and os.path.exists(input_path) \
+        and os.path.getmtime(output_path) >= os.path.getmtime(input_path)
+
+def scores_are_current(pair, translations_path, scores_path, model_name):
+    """True when the results are newer than the translations and were scored with ``model_name``."""
+    return is_up_to_date(translations_path, scores_path) and scored_with(scores_path, pair.name) == model_name
+
+def reuse_scores(pair, translations_path, scores_path, model_name, chunk_size=100_000):
+    """Reports that scoring is skipped and prints the summary of the existing results."""
+    print(f"\n[{pair.name}] {scores_path} is newer than {translations_path} and was scored with {model_name}; "
+          f"skipping COMET scoring (use --force to re-score).")
+    print_cached_summary(pair, scores_path, chunk_size)
+
+def print_cached_summary(pair, output_path, chunk_size=100_000):
+    """Prints the system-level scores of an existing results file from its aggregate index.
+
+    The results file is only read (in blocks) if the index is missing or out of date.
+    """
+    print_summary(current_index(output_path, pair.name, chunk_size), pair.name, index_path(output_path))
+
+def score_pair(pair, df, output_path, model_name=comet_model_name, batch_size=15):
+    """Scores every system of one pair against the human reference and saves the long-format results."""
+    check_columns(df, ["Scale", pair.source_column, pair.reference_column] + scored_columns(pair),
+                  f"[{pair.name}] translations")
+    df = preprocess_for_scoring(pair, df)
+
+    # Convert the necessary columns to lists for processing
+    Original = df[pair.source_column].tolist()
+    Reference = df[pair.reference_column].tolist()
+    systems = scored_columns(pair)
+
+    results_with_ref = score_systems(model_name, Original, Reference,
+                                     {name: df[name].tolist() for name in systems}, batch_size=batch_size)
+
+    # Create a DataFrame combining all evaluation results with reference (wide format)
+    df_results_with_ref = pd.DataFrame({
+        'Scale': df['Scale'],
+        **{("Human" if name == pair.human_column else name): results_with_ref[name]["sentence_scores"]
+           for name in systems}
+    })
+
+    # Round all numerical values to three decimal places
+    df_results_with_ref = df_results_with_ref.round(3)
+
+    # Convert the wide DataFrame into long format using melt
+    df_results_with_ref = pd.melt(df_results_with_ref, id_vars='Scale',
+                                  var_name='Translation',
+                                  value_name='Sentence_Score')
+
+    # Save the results DataFrame to a CSV file
+    df_results_with_ref.to_csv(output_path, index=False, sep=";", encoding="utf-8-sig")
+    print(f"\n[{pair.name}] Evaluation with reference completed. Results saved at: {output_path}")
+
+    # Summaries and plots read the per-scale/per-system sums instead of the sentence scores
+    index = AggregateIndex()
+    index.add(pair.name, df_results_with_ref)
+    print_summary(index, pair.name, update_index(output_path, pair.name, index, model_name))
+
+def score_or_reuse(pair, df, translations_path, scores_path, model_name, batch_size, force=False):
+    """Scores a pair unless its results are newer than its translations and come from ``model_name``."""
+    if not force and scores_are_current(pair, translations_path, scores_path, model_name):
+        reuse_scores(pair, translations_path, scores_path, model_name)
+        return
+    score_pair(pair, df, scores_path, model_name=model_name, batch_size=batch_size)
+
+
+# ------------------ Pipeline ------------------
+def default_paths(pair, data_dir="."):
+    """Questionnaire, translations, scores and request log paths of a pair inside ``data_dir``."""
+    return {
+        "questionnaire": os.path.join(data_dir, pair.questionnaire_file),
+        "translations": os.path.join(data_dir, pair.translations_file),
+        "scores": os.path.join(data_dir, pair.scores_file),
+        "round_trip": os.path.join(data_dir, pair.round_trip_file),
+        "requests": os.path.join(data_dir, pair.requests_file),
+    }
+
+def run_pipeline(pair_names, stages=STAGES, data_dir=".", providers=None, model_name=comet_model_name,
+                 batch_size=15, dry_run=False, force=False, paths=None, chunk_size=None):
+    """Runs the requested stages for every language pair in one process.
+
+    ``paths`` optionally maps a pair name to the paths returned by ``default_paths``.
+    With ``chunk_size``, every stage works on blocks of that many rows (see chunked.py).
+    """
+    providers = list(PROVIDERS) if providers is None else providers
+    pairs = [LANGUAGE_PAIRS[name] for name in pair_names]
+    paths = {pair.name: (paths or {}).get(pair.name) or default_paths(pair, data_dir) for pair in pairs}
+
+    if chunk_size:
+        from Pipeline.chunked import run_pipeline_chunked
+
+        run_pipeline_chunked(pairs, stages, paths, providers, model_name=model_name, batch_size=batch_size,
+                             dry_run=dry_run, force=force, chunk_size=chunk_size)
+        return
+
+    if "mt" in stages:
+        jobs = [prepare_translation_job(pair, paths[pair.name]["questionnaire"], paths[pair.name]["translations"],
+                                        providers, force=force) for pair in pairs]
+        if dry_run:
+            for job in jobs:
+                report_translation_job(job)
+            print("\nDry run: inputs are valid; nothing was translated or scored.")
+            return
+
+        def on_job_done(job):
+            if job.changed or not os.path.exists(job.output_path):
+                job.df.to_csv(job.output_path, index=False, sep=";", encoding="utf-8-sig")
+                print(f"\n[{job.pair.name}] All translations completed and saved at: {job.output_path}")
+                if job.changed:
+                    requests_path = paths[job.pair.name]["requests"]
+                    request_log = job.request_log()
+                    request_log.to_csv(requests_path, index=False, sep=";", encoding="utf-8-sig")
+                    report_requests(job.pair, request_log["Status"].value_counts(), requests_path)
+            else:
+                print(f"\n[{job.pair.name}] All translations cached in: {job.output_path}")
+            if "comet" in stages:
+                score_or_reuse(job.pair, job.df, job.output_path, paths[job.pair.name]["scores"],
+                               model_name, batch_size, force=force)
+
+        translate_pairs(jobs, providers, on_job_done)
+        return
+
+    for pair in pairs:
+        translations_path, scores_path = paths[pair.name]["translations"], paths[pair.name]["scores"]
+        df = load_translations(pair, translations_path)
+        if dry_run:
+            status = "up to date" if not force and scores_are_current(pair, translations_path, scores_path,
+                                                                      model_name) else "to be scored"
+            print(f"Dry run: {translations_path} is valid ({len(df)} rows, {len(scored_columns(pair))} systems); "
+                  f"{scores_path} is {status}.")
+            continue
+        score_or_reuse(pair, df, translations_path, scores_path, model_name, batch_size, force=force)
+
+
+# ------------------ Command Line ------------------
+def _add_common_arguments(parser):
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Process the CSV files in blocks of this many rows to bound memory use.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Validate the inputs and report the pending work without calling "
+                             "any provider or loading COMET.")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore cached translations and scores.")
+
+def _add_provider_argument(parser):
+    parser.add_argument("--providers", nargs="+", choices=list(PROVIDERS), default=list(PROVIDERS),
+                        help="Providers to run; the others keep their cached columns.")
+
+def _add_comet_arguments(parser):
+    parser.add_argument("--model", default=comet_model_name, help="COMET checkpoint to download and load.")
+    parser.add_argument("--batch-size", type=int, default=15, help="COMET prediction batch size.")
+
+def translation_main(pair_name, argv=None):
+    """Command line of the single-pair MT scripts in MT_Code/."""
+    pair = LANGUAGE_PAIRS[pair_name]
+    defaults = default_paths(pair)
+    parser = argparse.ArgumentParser(
+        description=f"Translate the questionnaire {pair.source_locale} -> {pair.target_locale} "
+                    f"with Azure, DeepL, OpenAI and Widn.AI.")
+    parser.add_argument("--input", default=defaults["questionnaire"], help="Questionnaire CSV (';' separated).")
+    parser.add_argument("--output", default=defaults["translations"], help="Combined translations CSV.")
+    _add_provider_argument(parser)
+    _add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    paths = {pair_name: {**defaults, "questionnaire": args.input, "translations": args.output}}
+    run_pipeline([pair_name], stages=["mt"], providers=args.providers, dry_run=args.dry_run, force=args.force,
+                 paths=paths, chunk_size=args.chunk_size)
+    print_processing_time(start_time)
+
+def scoring_main(pair_name, argv=None):
+    """Command line of the single-pair COMET scripts in COMET_Analysis/."""
+    pair = LANGUAGE_PAIRS[pair_name]
+    defaults = default_paths(pair)
+    parser = argparse.ArgumentParser(
+        description=f"Score {pair.source_locale} -> {pair.target_locale} translations against "
+                    f"the '{pair.reference_column}' reference with COMET.")
+    parser.add_argument("--input", default=defaults["translations"], help="Combined translations CSV.")
+    parser.add_argument("--output", default=defaults["scores"], help="COMET results CSV (long format).")
+    _add_comet_arguments(parser)
+    _add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    run_pipeline([pair_name], stages=["comet"], model_name=args.model, batch_size=args.batch_size,
+                 dry_run=args.dry_run, force=args.force, chunk_size=args.chunk_size,
+                 paths={pair_name: {**defaults, "translations": args.input, "scores": args.output}})
+    print_processing_time(start_time)
+
+def main(argv=None):
+    """Command line of Pipeline/run_pipeline.py: several pairs and stages in one process."""
+    parser = argparse.ArgumentParser(
+        description="Translate and score several language pairs in one process, sharing "
+                    "provider sessions, caches and the COMET model.")
+    parser.add_argument("--pairs", nargs="+", choices=list(LANGUAGE_PAIRS), default=list(LANGUAGE_PAIRS),
+                        help="Language pairs to run.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Stages to run.")
+    parser.add_argument("--data-dir", default=".", help="Directory holding the input and output CSV files.")
+    parser.add_argument("--round-trip", action="store_true",
+                        help="Stream each pair as round trips: translate, back-translate with the same "
+                             "provider and score in micro-batches (see Pipeline/streaming.py).")
+    parser.add_argument("--micro-batch-size", type=int, default=32,
+                        help="Round trips per COMET micro-batch in --round-trip mode.")
+    _add_provider_argument(parser)
+    _add_comet_arguments(parser)
+    _add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    if args.round_trip:
+        from Pipeline.streaming import run_round_trip
+
+        for name in args.pairs:
+            pair = LANGUAGE_PAIRS[name]
+            paths = default_paths(pair, args.data_dir)
+            if args.dry_run:
+                n_items = sum(chunk[pair.source_column].notna().sum()
+                              for chunk in iter_sources(pair, paths["questionnaire"], args.chunk_size or 10_000))
+                print(f"Dry run: [{name}] {n_items} items x "
+                      f"{len(args.providers)} providers would be round-tripped into {paths['round_trip']}.")
+                continue
+            run_round_trip(pair, paths["questionnaire"], paths["round_trip"], providers=args.providers,
+                           model_name=args.model, batch_size=args.batch_size,
+                           micro_batch_size=args.micro_batch_size, chunk_size=args.chunk_size or 10_000)
+        print_processing_time(start_time)
+        return
+
+    run_pipeline(args.pairs, stages=args.stages, data_dir=args.data_dir, providers=args.providers,
+                 model_name=args.model, batch_size=args.batch_size, dry_run=args.dry_run, force=args.force,
+                 chunk_size=args.chunk_size)
+    print_processing_time(start_time)
@@ -0,0 +1,244 @@
+"""GEE analysis of the COMET results, shared by the scripts in GEE_Analysis/.
+
+Both directions fit the same Gaussian and Gamma GEE models (Translation + Scale, items
+as clusters) and draw the same bar plot; they differ only in their results file, figure
+and scale order, which come from the pair's fields in directions.py.
+
+statsmodels, matplotlib and seaborn are imported on first use, so --help and --dry-run
+validate the scores without loading the modelling and plotting stacks. Scale means and
+the plotted mean/SE come from the aggregate index kept by the scoring stage (see
+aggregates.py); only the GEE fit reads the sentence scores.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from Pipeline.aggregates import current_index
+from Pipeline.directions import LANGUAGE_PAIRS
+
+SYSTEMS = ["Human", "Azure", "DeepL", "OpenAI", "WidnAI"]
+SCORE_COLUMNS = ["Scale", "Translation", "Sentence_Score"]
+FIGURE_DIR = "Figures"
+
+
+# === STEP 1: Load and structure data ===
+def _check_score_columns(df, path):
+    missing = [col for col in SCORE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing required column(s): {', '.join(missing)}")
+
+def read_scores_chunked(path, chunk_size):
+    """Reads the COMET results block by block, keeping Scale and Translation as categoricals.
+
+    Only the compact columns (category codes and float scores) of each block are kept,
+    so peak memory stays close to the size of the final frame.
+    """
+    scales, translations, scores = [], [], []
+    for chunk in pd.read_csv(path, sep=";", encoding="utf-8-sig", chunksize=chunk_size,
+                             dtype={"Scale": "category", "Translation": "category"}):
+        _check_score_columns(chunk, path)
+        scales.append(chunk["Scale"])
+        translations.append(chunk["Translation"])
+        scores.append(pd.to_numeric(chunk["Sentence_Score"], errors="coerce").to_numpy(dtype=float))
+    if not scores:
+        return pd.DataFrame({"Scale": pd.Categorical([]), "Translation": pd.Categorical([]),
+                             "Sentence_Score": np.array([], dtype=float)})
+    return pd.DataFrame({
+        "Scale": union_categoricals(scales),
+        "Translation": union_categoricals(translations),
+        "Sentence_Score": np.concatenate(scores),
+    })
+
+def load_scores(path, chunk_size=None):
+    """Reads the long-format COMET results and builds the categorical GEE design."""
+    if chunk_size:
+        df = read_scores_chunked(path, chunk_size)
+    else:
+        df = pd.read_csv(path, sep=";", encoding="utf-8-sig")
+    _check_score_columns(df, path)
+    df["Sentence_Score"] = pd.to_numeric(df["Sentence_Score"], errors="coerce")
+
+    # Create Item_ID
+    n_systems = df["Translation"].nunique()
+    n_sentences = len(df) // n_systems
+    df["Item_ID"] = np.tile(np.arange(1, n_sentences + 1), n_systems)
+
+    # Ensure categorical types
+    df["Translation"] = df["Translation"].astype("category")
+    df["Scale"] = df["Scale"].astype("category")
+    df["Item_ID"] = df["Item_ID"].astype("category")
+
+    # Set 'Human' as reference for Translation
+    df["Translation"] = df["Translation"].cat.reorder_categories(SYSTEMS, ordered=True)
+    return df
+
+
+# === STEP 2: Reference scale ===
+def scale_order(pair, index):
+    """Scale order of the model and the plot; the first scale is the reference.
+
+    Pairs without a fixed ``gee_scale_order`` use their best-performing scale by COMET mean.
+    """
+    if pair.gee_scale_order:
+        return list(pair.gee_scale_order)
+
+    mean_scores = index.summary(pair.name, by=["Scale"]).set_index("Scale")["Mean"]
+    mean_scores = mean_scores.sort_values(ascending=False, kind="stable")
+    best_scale = mean_scores.index[0]
+    print(f"Best-performing scale by COMET mean: {best_scale}")
+
+    return [best_scale] + [s for s in mean_scores.index if s != best_scale]
+
+def order_scales(df, ordered_scales):
+    """Reorders the Scale categories so that the first scale is the reference."""
+    df["Scale"] = df["Scale"].cat.reorder_categories(ordered_scales, ordered=True)
+    return df
+
+
+# === STEP 3: Fit both GEE models (Gaussian and Gamma) ===
+def fit_models(df):
+    """Fits the Gaussian and Gamma GEE models with an exchangeable working correlation."""
+    from statsmodels.genmod.generalized_estimating_equations import GEE
+    from statsmodels.genmod.families import Gaussian, Gamma
+    from statsmodels.genmod.cov_struct import Exchangeable
+
+    gee_gaussian = GEE.from_formula("Sentence_Score ~ Translation + Scale",
+                                    groups="Item_ID", data=df,
+                                    family=Gaussian(), cov_struct=Exchangeable())
+    result_gaussian = gee_gaussian.fit()
+
+    gee_gamma = GEE.from_formula("Sentence_Score ~ Translation + Scale",
+                                 groups="Item_ID", data=df,
+                                 family=Gamma(), cov_struct=Exchangeable())
+    result_gamma = gee_gamma.fit()
+    return result_gaussian, result_gamma
+
+
+# === STEP 4: QIC calculation ===
+def calculate_qic(model):
+    mu = model.fittedvalues
+    y = model.model.endog
+    deviance = model.family.deviance(y, mu)
+    X = model.model.exog
+    cov_beta = model.cov_params()
+    # trace(X V X') without building the n x n matrix
+    trace = np.einsum("ij,ij->", X @ np.asarray(cov_beta), X)
+    return deviance + 2 * trace
+
+
+# === STEP 6: Plot ===
+def summarize_scores(index, direction, ordered_scales):
+    """Mean COMET score and SE per translation system and scale, from the aggregate index."""
+    summary = index.summary(direction, by=["Translation", "Scale"])
+    summary["Translation"] = pd.Categorical(summary["Translation"], categories=SYSTEMS, ordered=True)
+    summary["Scale"] = pd.Categorical(summary["Scale"], categories=ordered_scales, ordered=True)
+    summary = summary.sort_values(["Translation", "Scale"]).reset_index(drop=True)
+    summary_df = summary[["Translation", "Scale", "Mean", "SE"]]
+    summary_df.columns = ["Translation", "Scale", "Mean_COMET", "SE_COMET"]
+    return summary_df
+
+def plot_scores(summary_df, output_path):
+    """Plots mean COMET score (± SE) per translation system and scale."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Garantir ordem consistente para Translation e Scale
+    translations = summary_df["Translation"].unique()
+    scales = summary_df["Scale"].unique()
+    palette_dict = dict(zip(scales, ["#062400", "#437512", "#C3DA8C", "#E5F5B7", "#D4DBB9", "#054823", "#65A756", "#81DB79"]))
+
+    # Criar gráfico
+    plt.figure(figsize=(12, 6))
+    barplot = sns.barplot(
+        data=summary_df,
+        x="Translation",
+        y="Mean_COMET",
+        hue="Scale",
+        palette=palette_dict,
+        ci=None
+    )
+
+    # Adicionar barras de erro manualmente
+    for i, (trans, scale) in enumerate(zip(summary_df["Translation"], summary_df["Scale"])):
+        mean = summary_df.loc[i, "Mean_COMET"]
+        sem = summary_df.loc[i, "SE_COMET"]
+        x_pos = list(translations).index(trans)
+        hue_idx = list(scales).index(scale)
+        total_hue = len(scales)
+        offset = -0.4 + (hue_idx + 0.5) * (0.8 / total_hue)
+        bar_x = x_pos + offset
+        plt.errorbar(
+            x=bar_x,
+            y=mean,
+            yerr=sem,
+            fmt='none',
+            ecolor='black',
+            capsize=4,
+            elinewidth=1
+        )
+
+    # Ajustes de layout
+    plt.title("COMET Score by Translation and psychological and health-related assessments")
+    plt.ylabel("COMET Score (A.u)")
+    plt.xlabel("")
+    plt.axhline(y=0.940, color='black', linestyle='--', linewidth=2.5)
+    plt.axhline(y=0.980, color='black', linestyle='--', linewidth=2.5)
+    plt.ylim(0.0, 1.00)
+    plt.legend(loc='lower right', bbox_to_anchor=(1.15, -0.05), title=None)
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    plt.savefig(output_path,
+                dpi=600, bbox_inches='tight', transparent=False)
+    plt.show()
+
+
+# ------------------ Command Line ------------------
+def gee_main(pair_name, argv=None):
+    """Command line of the single-pair GEE scripts in GEE_Analysis/."""
+    pair = LANGUAGE_PAIRS[pair_name]
+    parser = argparse.ArgumentParser(
+        description=f"GEE analysis and plot of {pair.source_locale} -> {pair.target_locale} COMET scores.")
+    parser.add_argument("--input", default=pair.scores_file, help="COMET results CSV (long format).")
+    parser.add_argument("--figure", default=os.path.join(FIGURE_DIR, pair.figure_file),
+                        help="Where to save the bar plot.")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Read the scores in blocks of this many rows to bound peak memory.")
+    parser.add_argument("--plot-only", action="store_true",
+                        help="Redraw the plot from the aggregate index without reading the scores or fitting.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Validate the scores and report the design without fitting or plotting.")
+    args = parser.parse_args(argv)
+
+    if args.dry_run:
+        # Validates the scores only; the aggregate index is neither built nor updated
+        df = load_scores(args.input, chunk_size=args.chunk_size)
+        print(f"Dry run: {args.input} is valid ({len(df)} scores, {df['Translation'].nunique()} systems, "
+              f"{df['Item_ID'].nunique()} items, {df['Scale'].nunique()} scales).")
+        return
+
+    index = current_index(args.input, pair.name)
+    ordered_scales = scale_order(pair, index)
+    if args.plot_only:
+        plot_scores(summarize_scores(index, pair.name, ordered_scales), args.figure)
+        return
+
+    df = order_scales(load_scores(args.input, chunk_size=args.chunk_size), ordered_scales)
+
+    result_gaussian, result_gamma = fit_models(df)
+
+    qic_gaussian = calculate_qic(result_gaussian)
+    qic_gamma = calculate_qic(result_gamma)
+
+    # === STEP 5: Results ===
+    print("\n=== GEE (Gaussian) Summary ===")
+    print(result_gaussian.summary())
+    print(f"\nQIC (Gaussian): {qic_gaussian:.4f}")
+
+    print("\n=== GEE (Gamma) Summary ===")
+    print(result_gamma.summary())
+    print(f"\nQIC (Gamma): {qic_gamma:.4f}")
+
+    plot_scores(summarize_scores(index, pair.name, ordered_scales), args.figure)
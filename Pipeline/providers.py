@@ -0,0 +1,186 @@
+import os
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+from Pipeline.scheduling import RequestOutcome, RequestScheduler
+
+# requests and the provider SDKs (deepl, openai) are imported on first use. Clients and
+# HTTP sessions are created once per process and shared by every language pair, so
+# translating several directions reuses the same connection pools.
+#
+# Every translate function takes a ``timeout`` in seconds, set per request by the
+# provider's RequestScheduler (see scheduling.py).
+
+# =================== Shared Clients ===================
+@lru_cache(maxsize=None)
+def get_http_session(provider):
+    """Returns the pooled HTTP session of a REST provider (one per provider, for thread safety)."""
+    import requests
+
+    return requests.Session()
+
+# The DeepL client takes no per-request timeout, so its connections get a fixed one and
+# the scheduler does the retrying; otherwise a hung endpoint would hold scheduler workers
+deepl_timeout = 30.0
+
+@lru_cache(maxsize=None)
+def get_deepl_translator():
+    """Creates the DeepL client on first use, with a bounded connection timeout and no retries."""
+    import deepl
+
+    deepl.http_client.min_connection_timeout = deepl_timeout
+    deepl.http_client.max_network_retries = 0
+    return deepl.Translator(os.getenv("DEEPL_API_KEY"))
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    """Creates the OpenAI client on first use, without its own retries (the scheduler retries)."""
+    import openai
+
+    # The SDK would otherwise retry failed requests twice with backoff, outside the retry budget
+    return openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+
+# =================== Azure Translator ===================
+azure_endpoint = "https://api-nam.cognitive.microsofttranslator.com/translate?api-version=3.0"
+
+def azure_headers():
+    """Builds the Azure request headers from the AZURE_API_KEY environment variable."""
+    return {
+        "Ocp-Apim-Subscription-Key": os.getenv("AZURE_API_KEY"),
+        "Content-Type": "application/json",
+        "Ocp-Apim-Subscription-Region": "brazilsouth"
+    }
+
+def translate_azure(text, pair, timeout=None):
+    """Translates text using Azure Translator API."""
+    if not text or pd.isna(text):
+        return None
+    source, target = pair.azure_codes
+    body = [{"text": text}]
+    try:
+        response = get_http_session("Azure").post(f"{azure_endpoint}&from={source}&to={target}",
+                                                  headers=azure_headers(), json=body, timeout=timeout)
+        response.raise_for_status()
+        return response.json()[0]['translations'][0]['text']
+    except Exception as e:
+        print(f"Azure error with '{text}': {e}")
+        return None
+
+# =================== DeepL Translator ===================
+def translate_deepl(text, pair, timeout=None):
+    """Translates text using DeepL API."""
+    # The DeepL client has no per-request timeout; its connections use deepl_timeout instead
+    source, target = pair.deepl_codes
+    try:
+        return get_deepl_translator().translate_text(text, source_lang=source, target_lang=target).text
+    except Exception as e:
+        print(f"DeepL error with '{text}': {e}")
+        return None
+
+# =================== OpenAI Translator ===================
+def translate_openai(text, pair, timeout=None):
+    """Translates text using OpenAI API without intervention."""
+    source, target = pair.openai_languages
+    prompt = f"Translate the following text from {source} to {target}, without any modifications or additional explanations:\n\n{text}"
+    try:
+        response = get_openai_client().chat.completions.create(
+            model='gpt-4-turbo',
+            messages=[
+                {'role': 'system', 'content': 'You are a neutral translator. Your task is only to translate text accurately, without adding opinions or modifying the content.'},
+                {'role': 'user', 'content': prompt}
+            ],
+            temperature=0.0,
+            timeout=timeout
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"OpenAI error with text '{text}': {e}")
+        return None
+
+
+# =================== Widn.AI Translator ===================
+widn_url = "https://api.widn.ai/v1/translate"
+
+def widn_headers():
+    """Builds the Widn.AI request headers from the WIDN_API_KEY environment variable."""
+    return {
+        "X-Api-Key": os.getenv("WIDN_API_KEY"),
+        "Content-Type": "application/json"
+    }
+
+def translate_widn(text, pair, model="vesuvius", timeout=None):
+    """Translates text using Widn.AI API.
+
+    A rate-limited request (HTTP 429) fails like any other error, so that the scheduler
+    retries it within its retry budget. The pause between requests is in request_pacing.
+    """
+    source, target = pair.widn_codes
+    data = {
+        "config": {
+            "sourceLocale": source,
+            "targetLocale": target,
+            "model": model
+        },
+        "sourceText": [text]
+    }
+
+    try:
+        response = get_http_session("WidnAI").post(widn_url, headers=widn_headers(), json=data, timeout=timeout)
+        if response.status_code == 200:
+            return response.json().get("targetText", [None])[0]
+        elif response.status_code == 429:
+            print(f"Widn.AI rate limit exceeded with text '{text}'.")
+            return None
+        else:
+            print(f"Widn.AI error with text '{text}': {response.status_code} - {response.text}")
+            return None
+    except Exception as e:
+        print(f"Error accessing Widn.AI with text '{text}': {e}")
+        return None
+
+
+# Output column, translation function and API key of every provider, in output order
+PROVIDERS = {
+    "Azure": (translate_azure, "AZURE_API_KEY"),
+    "DeepL": (translate_deepl, "DEEPL_API_KEY"),
+    "OpenAI": (translate_openai, "OPENAI_API_KEY"),
+    "WidnAI": (translate_widn, "WIDN_API_KEY"),
+}
+
+@lru_cache(maxsize=None)
+def get_scheduler(provider):
+    """Returns the request scheduler of a provider, shared by every pair in the process."""
+    return RequestScheduler(provider, PROVIDERS[provider][0])
+
+# Seconds to pause after each answered request, to stay under the provider's rate limit.
+# The pause follows the scheduler's call, so it is not counted as request latency and
+# does not delay hedges or retries.
+request_pacing = {"WidnAI": 1.0}
+
+# =================== Translation Cache ===================
+# Successful translations keyed by (provider, source locale, target locale, text), shared
+# by every pair in the process so that repeated items are only sent once per provider.
+# The cache is emptied when it reaches translation_cache_limit entries, which bounds its
+# memory on corpora that do not fit in memory.
+_translation_cache = {}
+translation_cache_limit = 1_000_000
+
+def translate_with_outcome(provider, text, pair):
+    """Translates text with a provider, reusing earlier results for the same locales and text.
+
+    Returns the translation (None on failure) and the RequestOutcome of the request.
+    """
+    key = (provider, pair.source_locale, pair.target_locale, text)
+    if key in _translation_cache:
+        return _translation_cache[key], RequestOutcome(provider, "cached", 0, 0.0, None)
+    translation, outcome = get_scheduler(provider).call(text, pair)
+    if translation is not None:
+        if len(_translation_cache) >= translation_cache_limit:
+            _translation_cache.clear()
+        _translation_cache[key] = translation
+        if request_pacing.get(provider):
+            time.sleep(request_pacing[provider])
+    return translation, outcome
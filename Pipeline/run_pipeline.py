@@ -0,0 +1,14 @@
+import os
+import sys
+
+# Make the Pipeline package importable when this file is run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Pipeline.engine import main  # noqa: E402
+
+# Translates and scores several language pairs in one process, e.g.
+#   python Pipeline/run_pipeline.py --data-dir Files --pairs ENtoPT PTtoEN
+
+
+if __name__ == "__main__":
+    main()
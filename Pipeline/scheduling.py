@@ -0,0 +1,182 @@
+"""Latency-aware request scheduling for the MT providers.
+
+Every provider gets a RequestScheduler that wraps its translate function:
+
+* Timeouts: each request gets ``timeout_multiplier`` times the p99 latency of the
+  provider's successful requests (``initial_timeout`` until ``min_samples`` requests
+  have succeeded), clamped to [min_timeout, max_timeout]. A request still running at
+  its deadline is abandoned. Timed-out requests never enter the latency window; each
+  consecutive timeout only widens the next deadline by ``timeout_backoff``, at most
+  ``max_backoff`` times, and the first success resets it.
+* Hedging: if a request has not answered by the provider's observed p95 latency (but
+  at least ``min_hedge_delay``), a duplicate is sent and whichever answers first is kept.
+* Retries: a failed request (the translate functions return None on errors) is sent
+  again while time remains, up to ``max_attempts`` requests in total.
+
+Hedges and retries draw on a RetryBudget, so that when a provider is slow or down the
+extra load stays a small fraction of the normal traffic. Every call returns a
+RequestOutcome, which the engine writes to the pair's request log.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import numpy as np
+
+OUTCOME_COLUMNS = ["Item_ID", "Provider", "Status", "Attempts", "Seconds", "Timeout"]
+
+
+@dataclass(frozen=True)
+class RequestOutcome:
+    """What happened to one translation request."""
+    provider: str
+    status: str         # ok, hedged (the duplicate won), retried, cached, failed or timeout
+    attempts: int       # requests sent, including hedges and retries
+    seconds: float      # wall time until the answer, or until the deadline
+    timeout: float      # deadline given to the request (None for cache hits)
+
+
+class LatencyTracker:
+    """Latencies of a provider's last ``window`` requests.
+
+    Percentiles are recomputed every ``refresh`` new samples rather than on every request.
+    """
+
+    def __init__(self, window=200, min_samples=20, refresh=10):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.refresh = refresh
+        self.percentiles = {}
+        self.new_samples = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.new_samples += 1
+            if self.new_samples >= self.refresh:
+                self.percentiles.clear()
+                self.new_samples = 0
+
+    def percentile(self, q):
+        """The q-th percentile of the recorded latencies, or None until there are enough samples."""
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            if q not in self.percentiles:
+                self.percentiles[q] = float(np.percentile(self.samples, q))
+            return self.percentiles[q]
+
+
+class RetryBudget:
+    """Allows extra requests (hedges and retries) up to ``ratio`` of the calls made, plus ``reserve``."""
+
+    def __init__(self, ratio=0.1, reserve=10):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.calls = 0
+        self.extra = 0
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.calls += 1
+
+    def withdraw(self):
+        """Takes one extra request from the budget; returns False if it is spent."""
+        with self.lock:
+            if self.extra >= self.reserve + self.ratio * self.calls:
+                return False
+            self.extra += 1
+            return True
+
+
+class RequestScheduler:
+    """Sends one provider's requests with adaptive timeouts, hedging and budgeted retries."""
+
+    def __init__(self, provider, translate, initial_timeout=30.0, min_timeout=2.0, max_timeout=120.0,
+                 timeout_multiplier=2.0, timeout_percentile=99, hedge_percentile=95, min_hedge_delay=0.1,
+                 timeout_backoff=1.5, max_backoff=4.0, max_attempts=3, budget=None, max_workers=8):
+        self.provider = provider
+        self.translate = translate
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.timeout_percentile = timeout_percentile
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.timeout_backoff = timeout_backoff
+        self.max_backoff = max_backoff
+        self.consecutive_timeouts = 0
+        self.max_attempts = max_attempts
+        self.latency = LatencyTracker()
+        self.budget = budget or RetryBudget()
+        # Abandoned requests keep a worker until their own HTTP timeout fires
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{provider}-request")
+
+    def timeout(self):
+        """Deadline of the next request, from the tail latency of successful requests."""
+        tail = self.latency.percentile(self.timeout_percentile)
+        base = self.initial_timeout if tail is None else self.timeout_multiplier * tail
+        widening = min(self.max_backoff, self.timeout_backoff ** self.consecutive_timeouts)
+        return min(self.max_timeout, max(self.min_timeout, base * widening))
+
+    def hedge_delay(self):
+        """Seconds after which a duplicate request is sent, or None while latencies are unknown."""
+        delay = self.latency.percentile(self.hedge_percentile)
+        return None if delay is None else max(self.min_hedge_delay, delay)
+
+    def _attempt(self, text, pair, timeout):
+        try:
+            return self.translate(text, pair, timeout=timeout)
+        except Exception as e:
+            print(f"{self.provider} error with '{text}': {e}")
+            return None
+
+    def call(self, text, pair):
+        """Translates ``text``; returns the translation (None on failure) and its RequestOutcome."""
+        timeout = self.timeout()
+        hedge_delay = self.hedge_delay()
+        start = time.monotonic()
+        deadline = start + timeout
+        self.budget.deposit()
+
+        running = {self.pool.submit(self._attempt, text, pair, timeout): "ok"}
+        attempts, hedged = 1, False
+        translation, status = None, "failed"
+        while running and translation is None:
+            wake = deadline if hedged or hedge_delay is None else min(deadline, start + hedge_delay)
+            done, _ = wait(running, timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for future in done:
+                kind = running.pop(future)
+                if future.result() is not None:
+                    translation, status = future.result(), kind
+                    break
+                if attempts < self.max_attempts and now < deadline and self.budget.withdraw():
+                    running[self.pool.submit(self._attempt, text, pair, deadline - now)] = "retried"
+                    attempts += 1
+            if translation is not None or done:
+                continue
+            if now >= deadline:
+                status = "timeout"
+                break
+            if not hedged:
+                hedged = True
+                if attempts < self.max_attempts and self.budget.withdraw():
+                    running[self.pool.submit(self._attempt, text, pair, deadline - now)] = "hedged"
+                    attempts += 1
+
+        for future in running:
+            future.cancel()
+        # Only answered calls are latency samples, timed from the call as its caller saw it;
+        # abandoned attempts that answer late are not counted
+        if translation is not None:
+            self.latency.record(time.monotonic() - start)
+        # Widen the next deadline a bounded step after each consecutive timeout
+        self.consecutive_timeouts = self.consecutive_timeouts + 1 if status == "timeout" else 0
+        return translation, RequestOutcome(self.provider, status, attempts, round(time.monotonic() - start, 3),
+                                           round(timeout, 3))
@@ -0,0 +1,98 @@
+from functools import lru_cache
+
+# comet (torch/lightning) is imported on first use. The model is loaded once per process
+# and shared by every language pair scored in it.
+
+comet_model_name = "Unbabel/XCOMET-XL"
+
+# ------------------ Model Setup ------------------
+@lru_cache(maxsize=None)
+def load_comet_model(name=comet_model_name):
+    """Downloads and loads the COMET model for translation evaluation on first use."""
+    from comet import download_model, load_from_checkpoint
+
+    model_path = download_model(name)
+    return load_from_checkpoint(model_path)
+
+def evaluate_translations_with_reference(model, src_list, mt_list, ref_list, batch_size=15):
+    """Evaluates machine translations against human references using COMET."""
+    # Prepare the input data by combining source, machine translation, and reference texts
+    data = [{"src": src, "mt": mt, "ref": ref} for src, mt, ref in zip(src_list, mt_list, ref_list)]
+    # Get COMET scores for the batch of translations
+    model_output = model.predict(data, batch_size=batch_size)
+    return model_output
+
+# Upper bound (inclusive) of each quality category; scores above the last one are 'Optimal'
+QUALITY_THRESHOLDS = [0.600, 0.800, 0.940, 0.980]
+QUALITY_CATEGORIES = ['Weak', 'Moderate', 'Good', 'Excellent', 'Optimal']
+
+def get_discrete_quality_score(score):
+    """Classifies translation quality into discrete categories based on the COMET score."""
+    for threshold, category in zip(QUALITY_THRESHOLDS, QUALITY_CATEGORIES):
+        if score <= threshold:
+            return category
+    return QUALITY_CATEGORIES[-1]
+
+def quality_category_codes(scores):
+    """Position in QUALITY_CATEGORIES of each score's category; vectorized get_discrete_quality_score."""
+    import numpy as np
+
+    return np.searchsorted(QUALITY_THRESHOLDS, np.asarray(scores, dtype=float), side="left")
+
+# ------------------ Segment Cache ------------------
+# (model, src, mt, ref) -> (score, error spans). Systems often produce identical
+# translations, so each distinct triple is scored once per process. The cache is
+# emptied before it would exceed segment_cache_limit entries.
+_segment_cache = {}
+segment_cache_limit = 1_000_000
+
+def score_triples(model_name, triples, batch_size=15):
+    """Scores (src, mt, ref) triples, running COMET only on the ones not seen before.
+
+    ``triples`` may be any iterable, e.g. a generator; it is consumed once. Returns one
+    (score, error spans) tuple per triple, in order.
+    """
+    keys, pending = [], {}
+    for src, mt, ref in triples:
+        key = (model_name, str(src), str(mt), str(ref))
+        keys.append(key)
+        if key not in _segment_cache and key not in pending:
+            pending[key] = (src, mt, ref)
+
+    if pending:
+        if len(_segment_cache) + len(pending) > segment_cache_limit:
+            # Keep only this call's hits so that they can still be looked up below
+            hits = {key: _segment_cache[key] for key in keys if key in _segment_cache}
+            _segment_cache.clear()
+            _segment_cache.update(hits)
+        src_new, mt_new, ref_new = zip(*pending.values())
+        evaluation = evaluate_translations_with_reference(load_comet_model(model_name), src_new, mt_new,
+                                                          ref_new, batch_size=batch_size)
+        # Only XCOMET checkpoints report error spans
+        error_spans = getattr(evaluation.metadata, "error_spans", None) or [None] * len(pending)
+        for key, score, spans in zip(pending, evaluation.scores, error_spans):
+            _segment_cache[key] = (score, spans)
+
+    return [_segment_cache[key] for key in keys]
+
+def score_systems(model_name, src_list, ref_list, mt_lists, batch_size=15):
+    """Scores several systems' translations in one COMET pass over their distinct triples.
+
+    ``mt_lists`` maps each system name to its translations. Returns, per system, the
+    sentence scores, the system score (their mean) and the error spans, in the same
+    layout as ``results_with_ref`` in the original scripts.
+    """
+    triples = ((src, mt, ref) for mt_list in mt_lists.values()
+               for src, mt, ref in zip(src_list, mt_list, ref_list))
+    scored = iter(score_triples(model_name, triples, batch_size=batch_size))
+
+    results = {}
+    for system, mt_list in mt_lists.items():
+        cached = [next(scored) for _ in range(min(len(src_list), len(mt_list), len(ref_list)))]
+        scores = [score for score, _ in cached]
+        results[system] = {
+            "sentence_scores": scores,
+            "system_score": sum(scores) / len(scores) if scores else float("nan"),
+            "error_spans": [spans for _, spans in cached]
+        }
+    return results
@@ -0,0 +1,185 @@
+"""Streaming round-trip mode.
+
+Every provider gets two threads connected by a bounded queue: the forward thread
+translates each questionnaire item (e.g. EN -> PT) and the back thread immediately
+translates that output back with the same provider (PT -> EN). Finished round trips
+flow through a second bounded queue to the COMET scorer in the main thread, which
+scores them in micro-batches and appends the rows to the results file while the
+network threads keep running. The bounded queues apply back-pressure, so a slow
+scorer never lets translations pile up in memory, and the questionnaire itself is
+read in blocks of ``chunk_size`` rows, so memory stays bounded for any corpus size.
+
+Each round trip yields two scores, and the outcome of both requests (see scheduling.py):
+    Forward_Score     src = source item,       mt = forward translation, ref = published version
+    Round_Trip_Score  src = forward translation, mt = back-translation,  ref = source item
+"""
+import csv
+import queue
+import threading
+import time
+
+import pandas as pd
+from tqdm import tqdm
+
+from Pipeline.directions import reverse_pair
+from Pipeline.engine import check_columns, iter_sources
+from Pipeline.providers import PROVIDERS, translate_with_outcome
+from Pipeline.scoring import comet_model_name, score_triples
+
+ROUND_TRIP_COLUMNS = ["Scale", "Item_ID", "Translation", "Forward", "Back_Translation",
+                      "Forward_Score", "Round_Trip_Score", "Forward_Status", "Back_Status"]
+
+# Marks the end of a provider's stream
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception raised in a worker thread to the scorer."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def iter_items(pair, path, chunk_size):
+    """Yields (Item_ID, scale, source, reference) for every item with a source text, block by block."""
+    for chunk in iter_sources(pair, path, chunk_size):
+        check_columns(chunk, [pair.reference_column], path)
+        for index, scale, source, reference in zip(chunk.index, chunk["Scale"], chunk[pair.source_column],
+                                                   chunk[pair.reference_column]):
+            if pd.notnull(source):
+                yield index + 1, scale, str(source), reference
+
+
+def _forward_worker(provider, pair, items, out_queue):
+    """Translates every item and hands it, with its translation, to the back thread."""
+    try:
+        for item in items:
+            out_queue.put((item, *translate_with_outcome(provider, item[2], pair)))
+    except BaseException as e:
+        out_queue.put(_Failure(e))
+    finally:
+        out_queue.put(_DONE)
+
+def _back_worker(provider, pair, in_queue, out_queue):
+    """Back-translates each forward translation with the same provider as soon as it arrives."""
+    try:
+        while True:
+            item = in_queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                out_queue.put(item)
+                continue
+            item, forward, forward_outcome = item
+            back, back_outcome = translate_with_outcome(provider, forward, pair) if forward else (None, None)
+            out_queue.put((provider, item, forward, back, forward_outcome.status,
+                           back_outcome.status if back_outcome else None))
+    except BaseException as e:
+        out_queue.put(_Failure(e))
+    finally:
+        out_queue.put(_DONE)
+
+
+def _expander(pair, column):
+    """Returns the preprocessing COMET applies to ``column`` when scoring ``pair``."""
+    if column in pair.contraction_columns:
+        import contractions
+
+        return lambda text: contractions.fix(str(text))
+    return lambda text: text
+
+
+def run_round_trip(pair, questionnaire_path, output_path, providers=None, model_name=comet_model_name,
+                   batch_size=15, micro_batch_size=32, queue_size=64, flush_interval=2.0, chunk_size=10_000):
+    """Translates, back-translates and scores the questionnaire of ``pair`` as a stream.
+
+    Rows are appended to ``output_path`` one micro-batch at a time, in arrival order;
+    ``Item_ID`` gives each row's position in the questionnaire. A partial micro-batch is
+    scored whenever no round trip arrives for ``flush_interval`` seconds.
+    """
+    providers = list(PROVIDERS) if providers is None else providers
+    backward = reverse_pair(pair)
+    start_time = time.time()
+
+    # ------------------ Network Stages ------------------
+    scored_queue = queue.Queue(maxsize=queue_size)
+    for provider in providers:
+        forward_queue = queue.Queue(maxsize=queue_size)
+        # Daemon threads, so that an error in the scorer does not leave the process hanging.
+        # Each forward thread reads the questionnaire itself, one block at a time.
+        items = iter_items(pair, questionnaire_path, chunk_size)
+        threading.Thread(target=_forward_worker, args=(provider, pair, items, forward_queue),
+                         daemon=True).start()
+        threading.Thread(target=_back_worker, args=(provider, backward, forward_queue, scored_queue),
+                         daemon=True).start()
+
+    # ------------------ Scoring Stage ------------------
+    expand_source = _expander(pair, pair.source_column)
+    expand_reference = _expander(pair, pair.reference_column)
+    expand_round_trip_reference = _expander(backward, backward.reference_column)
+    expand_forward = {provider: _expander(pair, provider) for provider in providers}
+    expand_back = {provider: _expander(backward, provider) for provider in providers}
+    totals = {provider: [0, 0.0, 0, 0.0] for provider in providers}  # forward n/sum, round-trip n/sum
+
+    def flush(batch, writer):
+        """Scores one micro-batch of round trips and writes its rows."""
+        triples, slots = [], []
+        for provider, (item_id, _, source, reference), forward, back, _, _ in batch:
+            if forward:
+                slots.append((provider, item_id, "forward"))
+                triples.append((expand_source(source), expand_forward[provider](forward),
+                                expand_reference(reference)))
+            if forward and back:
+                slots.append((provider, item_id, "round_trip"))
+                triples.append((forward, expand_back[provider](back),
+                                expand_round_trip_reference(source)))
+
+        scores = {}
+        for slot, (score, _) in zip(slots, score_triples(model_name, triples, batch_size=batch_size)):
+            scores[slot] = round(score, 3)
+
+        for provider, (item_id, scale, _, _), forward, back, forward_status, back_status in batch:
+            forward_score = scores.get((provider, item_id, "forward"))
+            round_trip_score = scores.get((provider, item_id, "round_trip"))
+            for k, score in [(0, forward_score), (2, round_trip_score)]:
+                if score is not None:
+                    totals[provider][k] += 1
+                    totals[provider][k + 1] += score
+            writer.writerow([scale, item_id, provider, forward, back, forward_score, round_trip_score,
+                             forward_status, back_status])
+
+    first_result = None
+    batch = []
+    finished = 0
+    with open(output_path, "w", newline="", encoding="utf-8-sig") as handle, \
+            tqdm(desc=f"[{pair.name}] Round trips") as bar:
+        writer = csv.writer(handle, delimiter=";")
+        writer.writerow(ROUND_TRIP_COLUMNS)
+
+        while finished < len(providers):
+            try:
+                item = scored_queue.get(timeout=flush_interval)
+            except queue.Empty:
+                item = None
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, _Failure):
+                raise item.error
+            elif item is not None:
+                batch.append(item)
+
+            if batch and (len(batch) >= micro_batch_size or item is None or finished == len(providers)):
+                flush(batch, writer)
+                handle.flush()
+                bar.update(len(batch))
+                batch = []
+                if first_result is None:
+                    first_result = time.time() - start_time
+
+    print(f"\n[{pair.name}] Round-trip results saved at: {output_path}")
+    if first_result is not None:
+        print(f"Time to first scored result: {first_result:.2f} seconds")
+    for provider, (n_forward, sum_forward, n_round_trip, sum_round_trip) in totals.items():
+        forward_mean = f"{sum_forward / n_forward:.3f}" if n_forward else "-"
+        round_trip_mean = f"{sum_round_trip / n_round_trip:.3f}" if n_round_trip else "-"
+        print(f"{provider}: forward {forward_mean}, round trip {round_trip_mean}")